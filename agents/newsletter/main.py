@@ -1,26 +1,32 @@
 import os
+import sys
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.health import ollama_probe
+from common.lazy import agent_modules, mark, preload, print_import_report
 
 load_dotenv()
 os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
 
-search_tool = SerperDevTool()
-
+# crewai, the LLM clients and the search tool are loaded once the user has picked a model
 def get_llm(use_gpt=True):
+    from common.llm import wrap_llm
     if use_gpt:
-        return ChatOpenAI(model="gpt-4o-mini")
-    return Ollama(
+        from langchain_openai import ChatOpenAI
+        return wrap_llm(ChatOpenAI(model="gpt-4o-mini"))
+    from langchain_community.llms import Ollama
+    return wrap_llm(Ollama(
         model="deepseek-r1:latest",
         base_url="http://localhost:11434",
         temperature=0.7
-    )
+    ))
 
 def create_agents(use_gpt=True):
+    from crewai import Agent
+    from common.search import get_search_tool
     llm = get_llm(use_gpt)
+    search_tool = get_search_tool()
     
     researcher = Agent(
         role='Research Specialist',
@@ -51,6 +57,7 @@ def create_agents(use_gpt=True):
     return researcher, fact_checker, writer
 
 def create_tasks(researcher, fact_checker, writer, topic):
+    from crewai import Task
     research_task = Task(
         description=f"Research the latest developments, key trends, and important insights about: {topic}",
         agent=researcher,
@@ -79,31 +86,37 @@ def create_tasks(researcher, fact_checker, writer, topic):
     
     return [research_task, verify_task, newsletter_task]
 
-def create_crew(agents, tasks):
-    return Crew(
-        agents=agents,
-        tasks=tasks,
-        verbose=True
-    )
-
 def main():
     print("Welcome to the Newsletter Creation Crew!")
+    mark("first prompt")
     use_gpt = input("Use GPT-4? (yes/no): ").lower() == 'yes'
+    # Load the heavy dependencies while the user types the topic
+    preload(*agent_modules(use_gpt, "common.pipeline"))
     
     if not use_gpt:
+        # Probe in the background while the user types the topic
+        ollama_probe.refresh()
         print("\nUsing Ollama - Ensure it's running on http://localhost:11434")
         print("Start with: ollama run deepseek-r1:latest")
     
     topic = input("\nNewsletter topic: ")
+    if not use_gpt and not ollama_probe.is_available():
+        print("\nWarning: Ollama is not reachable at http://localhost:11434")
     
     try:
         researcher, fact_checker, writer = create_agents(use_gpt)
         tasks = create_tasks(researcher, fact_checker, writer, topic)
-        crew = create_crew([researcher, fact_checker, writer], tasks)
         
-        result = crew.kickoff()
+        # The writer gets the research and fact check condensed to the context budget
+        from common.pipeline import run_pipeline
+        result = run_pipeline(tasks)
         print("\nNewsletter Result:")
         print(result)
+        from common.search import search_cache_summary
+        from common.llm import llm_cache_summary
+        print(search_cache_summary())
+        print(llm_cache_summary())
+        print_import_report()
         
     except Exception as e:
         print(f"\nError: {str(e)}")
@@ -1,21 +1,28 @@
 import os
+import sys
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.health import ollama_probe
+from common.lazy import agent_modules, mark, preload, print_import_report
 
 load_dotenv()
 
 os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
 
-search_tool = SerperDevTool()
-
+# crewai and the LLM clients are imported once the user has picked a model
 def create_research_agent(use_gpt=True):
+    from crewai import Agent
+    from common.llm import wrap_llm
+    from common.search import get_search_tool
+
     if use_gpt:
+        from langchain_openai import ChatOpenAI
         llm = ChatOpenAI(model="o3-mini")
     else:
-        llm = Ollama(model="llama3.1") 
+        from langchain_community.llms import Ollama
+        llm = Ollama(model="llama3.1")
+    llm = wrap_llm(llm)
 
     return Agent(
         role='Research Specialist',
@@ -23,11 +30,12 @@ def create_research_agent(use_gpt=True):
         backstory='You are an experienced researcher with expertise in finding and synthesizing information from various sources.',
         verbose=True,
         allow_delegation=False,
-        tools=[search_tool],
+        tools=[get_search_tool()],
         llm=llm
     )
 
 def create_research_task(agent, topic):
+    from crewai import Task
     return Task(
         description=f"Research the following topic and provide a comprehensive summary: {topic}",
         agent=agent,
@@ -35,17 +43,33 @@ def create_research_task(agent, topic):
     )
 
 def run_research(topic, use_gpt=True):
+    from crewai import Crew
+    from common.tracing import record_step, trace_run
     agent = create_research_agent(use_gpt)
     task = create_research_task(agent, topic)
-    crew = Crew(agents=[agent], tasks=[task])
-    result = crew.kickoff()
+    crew = Crew(agents=[agent], tasks=[task], step_callback=record_step)
+    with trace_run("research"):
+        result = crew.kickoff()
     return result
 
 if __name__ == "__main__":
     print("Welcome to the Research Agent!")
+    mark("first prompt")
     use_gpt = input("Do you want to use GPT? (yes/no): ").lower() == 'yes'
+    # Load the heavy dependencies while the user types the topic
+    preload(*agent_modules(use_gpt))
+    if not use_gpt:
+        # Probe in the background while the user types the topic
+        ollama_probe.refresh()
     topic = input("Enter the research topic: ")
+    if not use_gpt and not ollama_probe.is_available():
+        print("Warning: Ollama is not reachable at http://localhost:11434. Start it with: ollama run llama3.1")
     
     result = run_research(topic, use_gpt)
     print("\nResearch Result:")
-    print(result)
\ No newline at end of file
+    print(result)
+    from common.search import search_cache_summary
+    from common.llm import llm_cache_summary
+    print(search_cache_summary())
+    print(llm_cache_summary())
+    print_import_report()
@@ -1,24 +1,29 @@
 import os
-import time
+import sys
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.lazy import agent_modules, mark, preload, print_import_report
 
 load_dotenv()
 
 os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
 
-search_tool = SerperDevTool()
-
+# crewai, the LLM clients and the search tool are loaded once the user has picked a model
 def create_llm(use_gpt=True):
+    from common.llm import wrap_llm
     if use_gpt:
-        return ChatOpenAI(model="gpt-4o-mini")
+        from langchain_openai import ChatOpenAI
+        return wrap_llm(ChatOpenAI(model="gpt-4o-mini"))
     else:
-        return Ollama(model="llama3.1")
+        from langchain_community.llms import Ollama
+        return wrap_llm(Ollama(model="llama3.1"))
     
 def create_agents(brand_name, llm):
+    from crewai import Agent
+    from common.search import get_search_tool
+    search_tool = get_search_tool()
+
     researcher = Agent(
         role="Social Media Researcher",
         goal=f"Research and gather information about {brand_name} from various sources",
@@ -64,59 +69,62 @@ def create_agents(brand_name, llm):
     return [researcher, social_media_monitor, sentiment_analyzer, report_generator]
 
 def create_tasks(brand_name, agents):
+    from crewai import Task
     research_task = Task(
         description=f"Research {brand_name} and provide a summary of their online presence, key information, and recent activities.",
         agent=agents[0],
+        context=[],
         expected_output="A structured summary containing: \n1. Brief overview of {brand_name}\n2. Key online platforms and follower counts\n3. Recent notable activities or campaigns\n4. Main products or services\n5. Any recent news or controversies"
     )
 
     monitoring_task = Task(
         description=f"Monitor social media platforms for mentions of '{brand_name}' in the last 24 hours. Provide a summary of the mentions.",
         agent=agents[1],
+        context=[],
         expected_output="A structured report containing: \n1. Total number of mentions\n2. Breakdown by platform (e.g., Twitter, Instagram, Facebook)\n3. Top 5 most engaging posts or mentions\n4. Any trending hashtags associated with {brand_name}\n5. Notable influencers or accounts mentioning {brand_name}"
     )
 
     sentiment_analysis_task = Task(
         description=f"Analyze the sentiment of the social media mentions about {brand_name}. Categorize them as positive, negative, or neutral.",
         agent=agents[2],
+        context=[monitoring_task],
         expected_output="A sentiment analysis report containing: \n1. Overall sentiment distribution (% positive, negative, neutral)\n2. Key positive themes or comments\n3. Key negative themes or comments\n4. Any notable changes in sentiment compared to previous periods\n5. Suggestions for sentiment improvement if necessary"
     )
 
     report_generation_task = Task(
         description=f"Generate a comprehensive report about {brand_name} based on the research, social media mentions, and sentiment analysis. Include key insights and recommendations.",
         agent=agents[3],
+        context=[research_task, monitoring_task, sentiment_analysis_task],
         expected_output="A comprehensive report structured as follows: \n1. Executive Summary\n2. Brand Overview\n3. Social Media Presence Analysis\n4. Sentiment Analysis\n5. Key Insights\n6. Recommendations for Improvement\n7. Conclusion"
     )
 
     return [research_task, monitoring_task, sentiment_analysis_task, report_generation_task]
 
-def run_social_media_monitoring(brand_name, use_gpt=True, max_retries=3):
+def run_social_media_monitoring(brand_name, use_gpt=True, max_retries=3, resume=True):
+    from common.pipeline import CheckpointStore, run_pipeline
     llm = create_llm(use_gpt)
     agents = create_agents(brand_name, llm)
     tasks = create_tasks(brand_name, agents)
-    
-    crew = Crew(
-        agents=agents,
-        tasks=tasks,
-        verbose=True
-    )
 
-    for attempt in range(max_retries):
-        try:
-            result = crew.kickoff()
-            return result
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {str(e)}")
-            if attempt < max_retries - 1:
-                print("Retrying...")
-                time.sleep(5)  # Wait for 5 seconds before retrying
-            else:
-                print("Max retries reached. Unable to complete the task.")
-                return None
+    # Research and monitoring run in parallel; finished tasks are checkpointed,
+    # so a retry only redoes the step that failed
+    store = CheckpointStore.for_tasks("social_media", tasks, use_gpt)
+    if not resume:
+        store.clear()
+
+    try:
+        return run_pipeline(tasks, store=store, max_retries=max_retries)
+    except Exception as e:
+        print(f"Max retries reached. Unable to complete the task: {str(e)}")
+        print("Completed steps were saved; run again to resume from the failed step.")
+        return None
 
 if __name__ == "__main__":
     print("Welcome to the Social Media Monitoring Crew!")
+    mark("first prompt")
     use_gpt = input("Do you want to use GPT? (yes/no): ").lower() == 'yes'
+    # Load the heavy dependencies while the user types the brand name
+    preload(*agent_modules(use_gpt, "common.pipeline"))
     brand_name = input("Enter the name of the brand or influencer you want to research: ")
     
     result = run_social_media_monitoring(brand_name, use_gpt)
@@ -126,4 +134,9 @@ if __name__ == "__main__":
         print("Final Report:")
         print(result)
     else:
-        print("Failed to generate the report. Please try again later.")
\ No newline at end of file
+        print("Failed to generate the report. Please try again later.")
+    from common.search import search_cache_summary
+    from common.llm import llm_cache_summary
+    print(search_cache_summary())
+    print(llm_cache_summary())
+    print_import_report()
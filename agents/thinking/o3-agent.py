@@ -1,33 +1,45 @@
 import os
+import sys
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool, WebsiteSearchTool
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.budget import PROFILES, agent_limits, get_profile
+from common.health import ollama_probe
+from common.lazy import agent_modules, mark, preload, print_import_report
 
 # Load environment variables
 load_dotenv()
 os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
 
-# Initialize enhanced search tools
-search_tool = SerperDevTool()
-website_tool = WebsiteSearchTool()
+# Keeps this agent's original 100/75/50 iteration caps unless another profile is chosen
+DEFAULT_BUDGET = "deep"
 
+# crewai, the LLM clients and the search tools (including the vector store behind the
+# website tool) are loaded once the user has picked a model
 def get_llm(use_gpt=True):
     """Get the specified language model"""
+    from common.llm import wrap_llm
     if use_gpt:
-        return ChatOpenAI(
+        from langchain_openai import ChatOpenAI
+        return wrap_llm(ChatOpenAI(
             model_name="o3-mini",
-        )
-    return Ollama(
+        ), budgeted=True)
+    from langchain_community.llms import Ollama
+    return wrap_llm(Ollama(
         model="deepseek-r1:latest",
         base_url="http://localhost:11434",
         temperature=0.7
-    )
+    ), budgeted=True)
 
-def create_agents(use_gpt=True):
+def create_agents(use_gpt=True, budget=None):
     """Create specialized research and analysis agents"""
+    from crewai import Agent
+    from common.search import get_search_tool
+    from common.website import get_website_tool
+    budget = get_profile(budget, DEFAULT_BUDGET)
     llm = get_llm(use_gpt)
+    search_tool = get_search_tool()
+    website_tool = get_website_tool()
     
     deep_researcher = Agent(
         role='Deep Research Specialist',
@@ -38,7 +50,7 @@ def create_agents(use_gpt=True):
         tools=[search_tool, website_tool],
         llm=llm,
         verbose=True,
-        max_iter=100,          # Increased iteration limit
+        **agent_limits("research", budget),  # Iteration cap from the run's budget profile
         allow_delegation=False, # Prevent unnecessary delegations
         max_rpm=50,            # Rate limit for API calls
         max_retry_limit=3      # Allow retries on failures
@@ -53,7 +65,7 @@ def create_agents(use_gpt=True):
         tools=[search_tool],
         llm=llm,
         verbose=True,
-        max_iter=75,
+        **agent_limits("analysis", budget),
         allow_delegation=False,
         max_rpm=30,
         max_retry_limit=2
@@ -67,7 +79,7 @@ def create_agents(use_gpt=True):
         accessibility and practical value.""",
         llm=llm,
         verbose=True,
-        max_iter=50,
+        **agent_limits("writing", budget),
         allow_delegation=False,
         max_rpm=20,
         max_retry_limit=2
@@ -77,6 +89,7 @@ def create_agents(use_gpt=True):
 
 def create_tasks(researcher, analyst, writer, research_query):
     """Create research tasks with clear objectives"""
+    from crewai import Task
     deep_research_task = Task(
         description=f"""Conduct focused research on: {research_query}
         
@@ -126,41 +139,59 @@ def create_tasks(researcher, analyst, writer, research_query):
     
     return [deep_research_task, analysis_task, report_task]
 
-def create_crew(agents, tasks):
-    """Create a crew with optimal settings"""
-    return Crew(
-        agents=agents,
-        tasks=tasks,
-        verbose=True,
-        max_rpm=100,  # Overall crew rate limit
-        process="sequential"
-    )
-
 def main():
     print("\n🔍 Welcome to Deep Research Crew!")
     print("\nAvailable Models:")
     print("1. OpenAI o3-mini (Requires API key)")
     print("2. Local DeepSeek-r1 (Requires Ollama)")
     
+    mark("first prompt")
     use_gpt = input("\nUse OpenAI o3-mini? (yes/no): ").lower() == 'yes'
+    # Load the heavy dependencies while the user types the query
+    preload(*agent_modules(use_gpt, "common.pipeline", "common.website", "common.ingest"))
     
     if not use_gpt:
+        # Probe in the background while the user types the query
+        ollama_probe.refresh()
         print("\nUsing Ollama with DeepSeek-r1")
         print("Ensure Ollama is running: ollama run deepseek-r1:latest")
     
     query = input("\nWhat would you like researched? (Be specific): ")
+    sources = input("\nSource URLs to index first (optional, space-separated): ").split()
+    budget = input(f"\nResearch depth ({'/'.join(PROFILES)}, Enter for default): ").strip().lower() or None
+    budget = get_profile(budget if budget in PROFILES else None, DEFAULT_BUDGET)
+    if not use_gpt and not ollama_probe.is_available():
+        print("\n⚠️ Ollama is not reachable at http://localhost:11434")
     
     try:
-        researcher, analyst, writer = create_agents(use_gpt)
+        researcher, analyst, writer = create_agents(use_gpt, budget)
         tasks = create_tasks(researcher, analyst, writer, query)
-        crew = create_crew([researcher, analyst, writer], tasks)
+        
+        if sources:
+            from common.ingest import format_stats, ingest_urls
+            # Embed all the sources in a few batched requests before the agents start
+            print(f"\n📥 {format_stats(ingest_urls(sources))}")
         
         print("\n🔍 Starting deep research process...")
-        result = crew.kickoff()
+        # The analyst and writer get the research condensed to the context budget
+        from common.pipeline import run_pipeline
+        result = run_pipeline(tasks, budget=budget)
         
         print("\n📊 Research Report:")
         print("==================")
         print(result)
+        from common.search import search_cache_summary
+        from common.llm import llm_cache_summary
+        from common.website import website_index_summary
+        from common.vector_store import maintain_after_run
+        print(search_cache_summary())
+        print(llm_cache_summary())
+        print(website_index_summary())
+        
+        maintenance = maintain_after_run()
+        if maintenance:
+            print(maintenance)
+        print_import_report()
         
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
@@ -1,43 +1,53 @@
 import streamlit as st
 import os
+import sys
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, LLM
-from crewai_tools import SerperDevTool, WebsiteSearchTool
+from crewai import Agent, Task, LLM
 from langchain_openai import ChatOpenAI
-import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.search import get_search_tool, search_cache_summary
+from common.ingest import format_stats, ingest_urls
+from common.website import get_website_tool, website_index_summary
+from common.llm import wrap_llm, llm_cache_summary
+from common.pipeline import run_pipeline
+from common.budget import PROFILES, agent_limits, get_profile
+from common.health import ollama_probe
+from common.vector_store import maintain_after_run
 
 # Load environment variables
 load_dotenv()
 os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
 
-# Initialize enhanced search tools
-search_tool = SerperDevTool()
-website_tool = WebsiteSearchTool()
+# The app's original 15/10/8 iteration caps, with the standard profile's time and token limits
+DEFAULT_BUDGET = dict(PROFILES["standard"], max_iter={"research": 15, "analysis": 10, "writing": 8})
 
-def check_ollama_availability():
-    """Check if Ollama server is running"""
-    try:
-        response = requests.get("http://localhost:11434/api/version")
-        return response.status_code == 200
-    except requests.exceptions.ConnectionError:
-        return False
+# Streamlit re-runs this script on every interaction; heavy objects are built once per
+# process and shared by all sessions through st.cache_resource
+@st.cache_resource
+def get_tools():
+    """Initialize enhanced search tools (opens the Chroma store once)"""
+    return get_search_tool(), get_website_tool()
 
+@st.cache_resource
 def get_llm(use_gpt=True):
-    """Initialize the specified language model"""   
+    """Initialize the specified language model, once per model choice"""   
     if use_gpt:
-        return ChatOpenAI(model_name="o3-mini")
+        return wrap_llm(ChatOpenAI(model_name="o3-mini"), budgeted=True)
     
     # Use CrewAI's LLM class with correct provider format
-    return LLM(
+    return wrap_llm(LLM(
         model="ollama/deepseek-r1:latest",
         base_url="http://localhost:11434",
         temperature=0.7
-    )
+    ), budgeted=True)
 
-def create_agents(use_gpt=True):
+def create_agents(use_gpt=True, budget=None):
     """Create specialized research and analysis agents"""
     try:
+        budget = get_profile(budget, DEFAULT_BUDGET)
         llm = get_llm(use_gpt)
+        search_tool, website_tool = get_tools()
         
         researcher = Agent(
             role='Deep Research Specialist',
@@ -47,7 +57,7 @@ def create_agents(use_gpt=True):
             tools=[search_tool, website_tool],
             llm=llm,
             verbose=True,
-            max_iter=15,
+            **agent_limits("research", budget),
             allow_delegation=False
         )
         
@@ -59,7 +69,7 @@ def create_agents(use_gpt=True):
             tools=[search_tool],
             llm=llm,
             verbose=True,
-            max_iter=10,
+            **agent_limits("analysis", budget),
             allow_delegation=False
         )
         
@@ -70,7 +80,7 @@ def create_agents(use_gpt=True):
             clear, engaging content while maintaining technical accuracy.""",
             llm=llm,
             verbose=True,
-            max_iter=8,
+            **agent_limits("writing", budget),
             allow_delegation=False
         )
         
@@ -125,28 +135,31 @@ def create_tasks(researcher, analyst, writer, topic):
     
     return [research_task, analysis_task, synthesis_task]
 
-def run_research(topic, use_gpt):
-    """Execute the research process"""
+def run_research(topic, use_gpt, on_task_complete=None, sources=(), budget=None):
+    """Execute the research process, reporting each task's output as soon as it is ready"""
     try:
         if use_gpt and not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY in your environment.")
         
-        if not use_gpt and not check_ollama_availability():
+        if not use_gpt and not ollama_probe.is_available():
             raise ConnectionError("Ollama server not running. Start with: ollama run deepseek-r1")
         
-        researcher, analyst, writer = create_agents(use_gpt)
+        budget = get_profile(budget, DEFAULT_BUDGET)
+        researcher, analyst, writer = create_agents(use_gpt, budget)
         if not all([researcher, analyst, writer]):
             raise Exception("Failed to create agents")
         
+        if sources:
+            # Embed all the sources in a few batched requests before the agents start
+            print(format_stats(ingest_urls(sources)))
+        
         tasks = create_tasks(researcher, analyst, writer, topic)
-        crew = Crew(
-            agents=[researcher, analyst, writer],
-            tasks=tasks,
-            verbose=True
-        )
+        result = run_pipeline(tasks, max_retries=1, on_task_complete=on_task_complete, budget=budget)
         
-        result = crew.kickoff()
-        # Convert CrewOutput to string for consistency
+        maintenance = maintain_after_run()
+        if maintenance:
+            print(maintenance)
+        # Convert TaskOutput to string for consistency
         return str(result)
     except Exception as e:
         return f"Error: {str(e)}"
@@ -166,12 +179,23 @@ def main():
         ["OpenAI o3-mini", "Local DeepSeek-r1"]
     )
     use_gpt = model_choice == "OpenAI o3-mini"
+    budget = st.sidebar.selectbox(
+        "Research Depth",
+        [None] + list(PROFILES),
+        format_func=lambda name: name or "default",
+        help="Caps iterations, time and tokens; searches also stop once they find little new. "
+             "The default is RESEARCH_BUDGET if set, otherwise the app's usual limits"
+    )
 
     if use_gpt and not os.getenv("OPENAI_API_KEY"):
         st.sidebar.warning("⚠️ OpenAI API key not found")
     
     if not use_gpt:
-        if not check_ollama_availability():
+        # Cached and refreshed in the background, so rendering never waits on the probe
+        ollama_status = ollama_probe.status()
+        if ollama_status is None:
+            st.sidebar.info("⏳ Checking Ollama...")
+        elif not ollama_status:
             st.sidebar.warning("⚠️ Ollama not running. Run: `ollama pull deepseek-r1 && ollama run deepseek-r1`")
         else:
             st.sidebar.success("✅ Ollama running")
@@ -189,6 +213,11 @@ def main():
         placeholder="Enter your research topic (be specific)...",
         help="More specific queries yield better results"
     )
+    sources = st.text_area(
+        "Source URLs (optional)",
+        placeholder="One URL per line",
+        help="Pages are embedded together before the research starts"
+    ).split()
 
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
@@ -196,10 +225,24 @@ def main():
 
     # Execute research
     if start_research and query:
-        with st.spinner("🔍 Conducting research..."):
-            result = run_research(query, use_gpt)
+        timings = []
+
+        def show_task_output(task, output, seconds):
+            timings.append((task.agent.role, seconds))
+            status.update(label=f"🔍 Conducting research... {task.agent.role} done ({seconds:.1f}s)")
+            st.markdown(f"#### ✅ {task.agent.role} · {seconds:.1f}s")
+            st.markdown(output.raw)
+
+        with st.status("🔍 Conducting research...", expanded=True) as status:
+            result = run_research(query, use_gpt, on_task_complete=show_task_output, sources=sources, budget=budget)
+            failed = isinstance(result, str) and result.startswith("Error:")
+            status.update(
+                label="❌ Research failed" if failed else "✅ Research finished",
+                state="error" if failed else "complete",
+                expanded=False
+            )
 
-        if isinstance(result, str) and result.startswith("Error:"):
+        if failed:
             st.error(result)
         else:
             st.success("✅ Research Complete!")
@@ -210,6 +253,9 @@ def main():
                 st.markdown("### Research Report")
                 st.markdown("---")
                 st.markdown(str(result))  # Ensure result is converted to string
+                st.caption(search_cache_summary())
+                st.caption(llm_cache_summary())
+                st.caption(website_index_summary())
                 
             with tab2:
                 st.markdown(f"""
@@ -223,6 +269,9 @@ def main():
                 - Tools: Web search, content analysis
                 - Method: Multi-agent collaboration
                 """)
+                st.markdown("**Task timings:**")
+                for role, seconds in timings:
+                    st.markdown(f"- {role}: {seconds:.1f}s")
     
     st.divider()
     st.markdown("*Built with CrewAI and Streamlit*")
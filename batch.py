@@ -0,0 +1,101 @@
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common.search import search_cache_summary
+
+
+def read_topics(source):
+    """Read one topic per line from a file, or from stdin when source is '-'"""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        lines = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def slugify(topic):
+    return re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:60] or "topic"
+
+
+def get_crew_factory(kind):
+    # Import only the module we need; each one sets up its own tools and model
+    if kind == "research":
+        from dynamic_research import create_crew
+        return create_crew
+    from dynamic_newsletter import create_newsletter_crew
+    return create_newsletter_crew
+
+
+def run_topic(factory, topic, output_path):
+    start = time.perf_counter()
+    crew = factory(topic)
+    result = crew.kickoff()
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(str(result))
+    return time.perf_counter() - start
+
+
+def run_batch(factory, topics, output_dir, workers=4):
+    """Run a crew per topic on a bounded pool and return (topic, path, seconds, error) rows"""
+    os.makedirs(output_dir, exist_ok=True)
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for index, topic in enumerate(topics, 1):
+            path = os.path.join(output_dir, f"{index:02d}-{slugify(topic)}.md")
+            futures[pool.submit(run_topic, factory, topic, path)] = (index, topic, path)
+
+        for future in as_completed(futures):
+            index, topic, path = futures[future]
+            try:
+                rows.append((index, (topic, path, future.result(), None)))
+                print(f"Finished '{topic}' -> {path}")
+            except Exception as e:
+                rows.append((index, (topic, path, None, str(e))))
+                print(f"Failed '{topic}': {str(e)}")
+
+    return [row for _, row in sorted(rows)]
+
+
+def print_summary(rows, wall_clock):
+    print("\nBatch summary:")
+    width = max(len(row[0]) for row in rows)
+    for topic, path, seconds, error in rows:
+        status = f"{seconds:8.1f}s  {path}" if error is None else f"  FAILED  {error}"
+        print(f"  {topic.ljust(width)}  {status}")
+
+    latencies = [row[2] for row in rows if row[3] is None]
+    print(f"\n{len(latencies)}/{len(rows)} topics succeeded in {wall_clock:.1f}s wall clock")
+    if latencies:
+        print(f"Per-topic latency: min {min(latencies):.1f}s, "
+              f"mean {sum(latencies) / len(latencies):.1f}s, max {max(latencies):.1f}s "
+              f"(serial total {sum(latencies):.1f}s)")
+    print(search_cache_summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many topics through the research or newsletter crew")
+    parser.add_argument("kind", choices=["research", "newsletter"], help="which crew to run")
+    parser.add_argument("topics", nargs="?", default="-", help="file with one topic per line (default: stdin)")
+    parser.add_argument("--workers", type=int, default=4, help="number of crews to run at once")
+    parser.add_argument("--output-dir", default="reports", help="where to write one file per topic")
+    args = parser.parse_args()
+
+    topics = read_topics(args.topics)
+    if not topics:
+        print("No topics given.")
+        sys.exit(1)
+
+    factory = get_crew_factory(args.kind)
+    start = time.perf_counter()
+    rows = run_batch(factory, topics, args.output_dir, args.workers)
+    print_summary(rows, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
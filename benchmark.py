@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PIPELINES = ("research", "newsletter", "social-media")
+
+# The stub's thought before each search; counting it in the prompt counts earlier searches
+SEARCH_THOUGHT = "I should search for more information"
+
+VOCABULARY = ("market", "growth", "model", "agent", "latency", "source", "trend", "report",
+              "signal", "insight", "customer", "launch", "network", "policy", "risk", "data")
+
+
+def build_stubs(args):
+    """Create the stand-in LLM and search tool; imported late so CACHE_DIR is already set"""
+    from crewai import LLM
+    from crewai_tools import SerperDevTool
+    from common.llm import ManagedLLM
+    from common.search import CachedSerperDevTool
+
+    class StubLLM(LLM):
+        """Deterministic local model: waits ``llm_latency`` and answers with ``llm_words`` words"""
+
+        def call(self, messages, tools=None, *extra, **kwargs):
+            prompt = json.dumps(messages, default=str)
+            time.sleep(args.llm_latency)
+            tool_names = re.findall(r"Tool Name: (.+?)(?:\\n|\n)", prompt)
+            # Search results repeat the query, so earlier searches are counted by the stub's own thought
+            searches = prompt.count(SEARCH_THOUGHT)
+            if tool_names and searches < args.tool_calls:
+                query = f"benchmark query {searches + 1}"
+                return (f"Thought: {SEARCH_THOUGHT}\nAction: {tool_names[0].strip()}\n"
+                        f"Action Input: {json.dumps({'search_query': query})}")
+            rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+            words = " ".join(rng.choice(VOCABULARY) for _ in range(args.llm_words))
+            return f"Thought: I now know the final answer\nFinal Answer: {words}"
+
+    class BenchmarkLLM(ManagedLLM, StubLLM):
+        """Goes through the same cache, rate limiter and tracing as a real client"""
+
+    class StubSerperDevTool(SerperDevTool):
+        def _run(self, **kwargs):
+            time.sleep(args.search_latency)
+            query = kwargs.get("search_query") or kwargs.get("query") or ""
+            return {
+                "searchParameters": {"q": query},
+                "organic": [
+                    {"title": f"Result {n} for {query}", "link": f"https://example.com/{n}",
+                     "snippet": " ".join(VOCABULARY[(n + i) % len(VOCABULARY)] for i in range(30)), "position": n}
+                    for n in range(1, args.search_results + 1)
+                ],
+            }
+
+    class BenchmarkSearchTool(CachedSerperDevTool, StubSerperDevTool):
+        """Keeps the disk cache and rate limiter in the path, with the network call stubbed"""
+
+    return BenchmarkLLM, BenchmarkSearchTool
+
+
+def install_stubs(args):
+    """Point the agents' LLM and search factories at the stand-ins"""
+    import common.llm
+    import common.search
+
+    llm_class, search_class = build_stubs(args)
+    common.llm.wrap_llm = lambda llm, use_cache=None, budgeted=False: llm_class(
+        model="benchmark/stub", use_cache=common.llm.LLM_CACHE_ENABLED if use_cache is None else use_cache)
+    common.search.get_search_tool = search_class
+
+
+def run_once(name, topic):
+    """Run one pipeline through run_pipeline and return its trace"""
+    from cli import load_agent
+    from common.pipeline import run_pipeline
+    from common.tracing import trace_run
+
+    module = load_agent(name)
+    with trace_run(f"benchmark_{name.replace('-', '_')}", print_summary=False) as run:
+        if name == "research":
+            agent = module.create_research_agent(True)
+            run_pipeline([module.create_research_task(agent, topic)], max_retries=1, verbose=False)
+        elif name == "newsletter":
+            run_pipeline(module.create_tasks(*module.create_agents(True), topic), max_retries=1, verbose=False)
+        elif module.run_social_media_monitoring(topic, True, max_retries=1, resume=False) is None:
+            raise RuntimeError("social media pipeline failed")
+    return run
+
+
+def clear_caches():
+    """Empty the search and LLM caches, so a run pays for every call like a first run would"""
+    from common.llm import LLM_CACHE_ENABLED, get_llm_cache
+    from common.search import get_search_cache
+
+    get_search_cache().clear()
+    if LLM_CACHE_ENABLED:
+        get_llm_cache().clear()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def benchmark(name, args):
+    """Time ``args.runs`` runs after one warm-up, then measure the memory peak separately.
+
+    Unless ``args.warm_cache`` is set, the caches are emptied before every run, so the
+    warm-up only warms imports and the stub latencies show up in every timed run.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_once(name, args.topic)
+
+    walls, cpus, overheads, hits = [], [], [], []
+    tasks = {}
+    for _ in range(args.runs):
+        if not args.warm_cache:
+            clear_caches()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = run_once(name, args.topic)
+        walls.append(time.perf_counter() - start_wall)
+        cpus.append(time.process_time() - start_cpu)
+        hits.append(sum(int(record.get("cache_hit") or 0) for record in run.spans))
+        for record in run.spans:
+            if record["kind"] == "task":
+                tasks.setdefault(record["name"], []).append(record["seconds"])
+            elif record["kind"] == "llm":
+                overheads.append(record["seconds"] - args.llm_latency)
+
+    # tracemalloc slows everything down, so it gets a run of its own
+    if not args.warm_cache:
+        clear_caches()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_once(name, args.topic)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall": {"min": min(walls), "median": statistics.median(walls), "max": max(walls)},
+        "cpu_per_run": statistics.mean(cpus),
+        "cache_hits_per_run": statistics.mean(hits),
+        "llm_call_overhead_ms": statistics.mean(overheads) * 1000 if overheads else 0.0,
+        "memory_peak_mb": peak / (1024 * 1024),
+        "tasks": {task: {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": max(values)}
+                  for task, values in tasks.items()},
+    }
+
+
+def print_report(results, args):
+    print(f"\nOffline benchmark: {args.runs} runs each, LLM {args.llm_latency * 1000:.0f}ms / "
+          f"{args.llm_words} words, search {args.search_latency * 1000:.0f}ms / {args.search_results} results, "
+          f"{args.tool_calls} tool call(s) per agent, caches {'kept warm' if args.warm_cache else 'emptied before each run'}, "
+          f"LLM cache {'on' if args.llm_cache else 'off'}")
+    for name, result in results.items():
+        wall = result["wall"]
+        print(f"\n{name}: wall {wall['median']:.3f}s median (min {wall['min']:.3f}s, max {wall['max']:.3f}s), "
+              f"CPU {result['cpu_per_run']:.3f}s/run, {result['cache_hits_per_run']:.0f} cache hits/run, "
+              f"{result['llm_call_overhead_ms']:.2f}ms overhead per LLM call, "
+              f"peak memory {result['memory_peak_mb']:.2f}MB")
+        width = max(len(task) for task in result["tasks"]) if result["tasks"] else 0
+        for task, stats in result["tasks"].items():
+            print(f"  {task.ljust(width)}  p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  max {stats['max']:.3f}s")
+
+
+def compare(results, baseline_path, tolerance):
+    """Return the pipelines whose median wall clock regressed beyond ``tolerance``"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["wall"]["median"], result["wall"]["median"]
+        change = (after - before) / before
+        print(f"{name}: {before:.3f}s -> {after:.3f}s ({change:+.0%})")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crew pipelines offline with stub LLM and search backends")
+    parser.add_argument("pipelines", nargs="*", default=list(PIPELINES),
+                        help=f"pipelines to run: {', '.join(PIPELINES)} (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per pipeline, after one warm-up")
+    parser.add_argument("--topic", default="benchmark topic")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--llm-words", type=int, default=200, help="words per stub LLM answer")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="seconds per stub search")
+    parser.add_argument("--search-results", type=int, default=10, help="results per stub search")
+    parser.add_argument("--tool-calls", type=int, default=1, help="searches each agent with tools makes before answering")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="keep the search and LLM caches between runs, to time the cached path")
+    parser.add_argument("--llm-cache", action="store_true", help="run with LLM_CACHE=1 (default: off)")
+    parser.add_argument("--keep-cache", action="store_true", help="use the real cache directory instead of a fresh one")
+    parser.add_argument("--json", help="write the results to this file (usable as a --baseline later)")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown before failing")
+    args = parser.parse_args()
+    unknown = [name for name in args.pipelines if name not in PIPELINES]
+    if unknown or args.runs < 1:
+        parser.error(f"unknown pipeline(s): {', '.join(unknown)}" if unknown else "--runs must be at least 1")
+
+    # Must happen before common.* is imported: nothing here may touch real caches or keys
+    if not args.keep_cache:
+        os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="benchmark-cache-")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("SERPER_API_KEY", "benchmark")
+    # Per-task latencies come from the run traces; the LLM cache is pinned, not inherited
+    os.environ["TRACE"] = "1"
+    os.environ["LLM_CACHE"] = "1" if args.llm_cache else "0"
+    install_stubs(args)
+
+    results = {name: benchmark(name, args) for name in dict.fromkeys(args.pipelines)}
+    print_report(results, args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=1)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"Slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import hmac
+import importlib.util
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+from common.disk_cache import cache_path
+from common.health import ollama_probe
+from common.lazy import mark, print_import_report, timed_import
+from common.tracing import trace_run
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.getenv("CLI_DAEMON_PORT", 8765))
+
+AGENTS = {
+    "research": "agents/research/main.py",
+    "newsletter": "agents/newsletter/main.py",
+    "social-media": "agents/social_media/main.py",
+    "deep-research": "agents/thinking/o3-agent.py",
+}
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def load_agent(name):
+    """Import an agent script by path (some live in folders that aren't packages)"""
+    with _modules_lock:
+        if name not in _modules:
+            path = os.path.join(ROOT_DIR, AGENTS[name])
+            spec = importlib.util.spec_from_file_location(f"agent_{name.replace('-', '_')}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[name] = module
+        return _modules[name]
+
+
+def run_crew(module, topic, use_gpt, budget=None):
+    from common.pipeline import run_pipeline
+    agents = module.create_agents(use_gpt, budget) if budget else module.create_agents(use_gpt)
+    return run_pipeline(module.create_tasks(*agents, topic), budget=budget)
+
+
+def run_job(job):
+    """Run one job ({"agent", "topic", "ollama", "sources"}) and return the result text"""
+    name = job["agent"]
+    topic = job["topic"]
+    use_gpt = not job.get("ollama")
+    if name not in AGENTS:
+        raise ValueError(f"Unknown agent '{name}' (choose from {', '.join(AGENTS)})")
+    if not use_gpt and not ollama_probe.is_available():
+        raise ConnectionError("Ollama is not reachable. Start it with: ollama serve")
+
+    module = load_agent(name)
+    with trace_run(name.replace("-", "_")):
+        return _run_agent(name, module, job, topic, use_gpt)
+
+
+def _run_agent(name, module, job, topic, use_gpt):
+    if name == "research":
+        result = module.run_research(topic, use_gpt)
+    elif name == "social-media":
+        result = module.run_social_media_monitoring(topic, use_gpt)
+        if result is None:
+            raise RuntimeError("Monitoring failed; completed steps were saved and will be resumed next time")
+    else:
+        if job.get("sources"):
+            from common.ingest import format_stats, ingest_urls
+            print(format_stats(ingest_urls(job["sources"])))
+        # Only the deep-research agent sizes its agents from a budget profile
+        budget = None
+        if name == "deep-research":
+            from common.budget import get_profile
+            budget = get_profile(job.get("budget"), module.DEFAULT_BUDGET)
+        result = run_crew(module, topic, use_gpt, budget)
+    return str(result)
+
+
+def token_path():
+    return cache_path("cli_daemon.token")
+
+
+def write_token():
+    """Create a fresh secret for this worker, readable only by the current user"""
+    token = secrets.token_hex(32)
+    path = token_path()
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def read_token():
+    try:
+        with open(token_path(), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def parse_job(line, token):
+    """Return the job on a line, or None unless it is a JSON object carrying the worker's token"""
+    try:
+        job = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(job, dict) or not hmac.compare_digest(str(job.pop("token", "")), token):
+        return None
+    return job
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """One JSON job per line in, one JSON response per line out.
+
+    Every job must carry the token from the worker's 0600 token file. The first line that
+    is not such a job closes the connection, so e.g. an HTTP request a web page sends to
+    the port never gets as far as its body.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            job = parse_job(line, self.server.token)
+            if job is None:
+                self.wfile.write((json.dumps({"ok": False, "error": "invalid job or token"}) + "\n").encode("utf-8"))
+                return
+            try:
+                if job.get("command") == "ping":
+                    response = {"ok": True, "uptime": time.time() - self.server.started}
+                else:
+                    response = {"ok": True, "result": run_job(job)}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            response["seconds"] = time.perf_counter() - start
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class JobServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def warm_up():
+    """Load every agent, both LLM clients and the shared tools before accepting jobs"""
+    for name in ("crewai", "langchain_openai", "langchain_community.llms", "common.search", "common.llm",
+                 "common.pipeline", "common.website", "common.ingest"):
+        try:
+            timed_import(name)
+        except ImportError as e:
+            print(f"Skipping {name}: {str(e)}")
+    for name in AGENTS:
+        load_agent(name)
+    from common.website import get_website_tool
+    get_website_tool()
+    ollama_probe.refresh()
+
+
+def serve(port=DAEMON_PORT):
+    start = time.perf_counter()
+    warm_up()
+    # Localhost only: jobs run with this user's API keys
+    server = JobServer((DAEMON_HOST, port), JobHandler)
+    server.started = time.time()
+    server.token = write_token()
+    print(f"Warm worker ready in {time.perf_counter() - start:.1f}s, listening on {DAEMON_HOST}:{port}")
+    print_import_report()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def submit(job, port=DAEMON_PORT):
+    """Send a job to a running worker and return its response, or None if none is listening.
+
+    Failures after the job was sent are raised instead: the worker may already be running
+    it, so the caller must not run it a second time.
+    """
+    token = read_token()
+    if token is None:
+        return None
+    try:
+        conn = socket.create_connection((DAEMON_HOST, port), timeout=1.0)
+    except OSError:
+        return None
+    with conn:
+        conn.settimeout(None)
+        conn.sendall((json.dumps(dict(job, token=token)) + "\n").encode("utf-8"))
+        with conn.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError("The worker closed the connection without replying")
+    return json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run any of the agents from one command")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in AGENTS:
+        sub = subparsers.add_parser(name, help=f"run the {name} agent")
+        sub.add_argument("topic", help="topic, brand name or research question")
+        sub.add_argument("--ollama", action="store_true", help="use the local Ollama model instead of OpenAI")
+        sub.add_argument("--output", help="also write the result to this file")
+        sub.add_argument("--daemon", action="store_true", help="send the job to a running worker (see 'serve')")
+        sub.add_argument("--port", type=int, default=DAEMON_PORT)
+        if name == "deep-research":
+            sub.add_argument("--source", action="append", default=[], help="URL to index before the research starts")
+            sub.add_argument("--budget", choices=["quick", "standard", "deep"],
+                             help="iteration, time and token budget (default: RESEARCH_BUDGET or deep)")
+    serve_parser = subparsers.add_parser("serve", help="keep a warm worker running and accept jobs on localhost")
+    serve_parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    args = parser.parse_args()
+    mark("arguments parsed")
+
+    if args.command == "serve":
+        serve(args.port)
+        return
+
+    job = {"agent": args.command, "topic": args.topic, "ollama": args.ollama,
+           "sources": getattr(args, "source", []), "budget": getattr(args, "budget", None)}
+    start = time.perf_counter()
+    result = None
+    if args.daemon:
+        try:
+            response = submit(job, args.port)
+        except (OSError, ValueError) as e:
+            print(f"Error: lost the worker after sending the job ({str(e)}); not running it again here.")
+            sys.exit(1)
+        if response is None:
+            print(f"No worker is listening on port {args.port}; running here instead.")
+        else:
+            if not response["ok"]:
+                print(f"Error: {response['error']}")
+                sys.exit(1)
+            result = response["result"]
+
+    ran_here = result is None
+    if ran_here:
+        try:
+            result = run_job(job)
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+
+    print(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(result)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+    if ran_here:
+        from common.search import search_cache_summary
+        from common.llm import llm_cache_summary
+        print(search_cache_summary())
+        print(llm_cache_summary())
+        print_import_report()
+
+
+if __name__ == "__main__":
+    main()
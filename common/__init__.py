@@ -0,0 +1 @@
+"""Shared helpers used by the agent scripts (caching, search tools, etc.)"""
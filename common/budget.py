@@ -0,0 +1,196 @@
+"""Per-run research budgets: iteration and time caps per agent, a token budget per run,
+and early termination once an agent's searches stop turning up anything new.
+
+The thinking agents always run under a profile (their own default, or one picked per
+run). Other pipelines only do when RESEARCH_BUDGET=quick|standard|deep is set. Search
+tools consult the budget: once returns diminish or the run's tokens are spent, they tell
+the agent to finalize its answer instead of searching again. RESEARCH_BUDGET=off turns
+that enforcement off everywhere.
+"""
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from common.tracing import event
+
+# Agents ask for their limits by slot, so scripts with different roles share profiles
+PROFILES = {
+    "quick": {
+        "max_iter": {"research": 8, "analysis": 6, "writing": 5},
+        "max_execution_time": 180,
+        "token_budget": 60_000,
+        "novelty_floor": 0.3,
+        "patience": 1,
+    },
+    "standard": {
+        "max_iter": {"research": 25, "analysis": 15, "writing": 10},
+        "max_execution_time": 600,
+        "token_budget": 250_000,
+        "novelty_floor": 0.2,
+        "patience": 2,
+    },
+    "deep": {
+        "max_iter": {"research": 100, "analysis": 75, "writing": 50},
+        "max_execution_time": 1800,
+        "token_budget": 1_000_000,
+        "novelty_floor": 0.1,
+        "patience": 3,
+    },
+}
+_setting = os.getenv("RESEARCH_BUDGET", "").lower()
+BUDGET_ENABLED = _setting not in ("off", "none", "0")
+# Overrides every script's own default profile when set
+DEFAULT_PROFILE = _setting if BUDGET_ENABLED and _setting else None
+
+# Searches always get this many tries before novelty can end them
+MIN_OBSERVATIONS = 2
+
+EXHAUSTED_MESSAGE = ("Search budget exhausted: {reason}. Do not search again; "
+                     "finalize your answer now with the information you already have.")
+
+_run_budget = contextvars.ContextVar("run_budget", default=None)
+_tracker = contextvars.ContextVar("novelty_tracker", default=None)
+
+
+def get_profile(name=None, default="standard"):
+    """Return a budget profile by name (falling back to RESEARCH_BUDGET, then ``default``); dicts pass through"""
+    profile = name or DEFAULT_PROFILE or default
+    if isinstance(profile, dict):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown budget profile '{profile}' (choose from {', '.join(PROFILES)})")
+    return PROFILES[profile]
+
+
+def agent_limits(slot, profile=None, default="standard"):
+    """Keyword arguments for crewai's Agent (max_iter) for a slot: research, analysis or writing.
+
+    The time limit is enforced by the search tools rather than crewai's
+    max_execution_time, which runs the agent on a thread of its own and would lose the
+    run's tracing and budget context.
+    """
+    return {"max_iter": get_profile(profile, default)["max_iter"][slot]}
+
+
+class RunBudget:
+    """Tokens spent across all agents in one run"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def charge(self, tokens):
+        with self._lock:
+            self.tokens += tokens
+
+    def spent(self):
+        return self.tokens >= self.profile["token_budget"]
+
+
+class NoveltyTracker:
+    """Scores each tool result by the share of URLs and facts not seen earlier in the task"""
+
+    def __init__(self, role, floor, patience, seconds):
+        self.role = role
+        self.floor = floor
+        self.patience = patience
+        self.deadline = time.monotonic() + seconds
+        self.seen = set()
+        self.history = []
+        self.exhausted = False
+
+    @staticmethod
+    def items(result):
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        urls = {f"url:{url.rstrip('.,')}" for url in re.findall(r"https?://[^\s\"'<>)\]]+", text)}
+        # A "fact" is any sentence-sized fragment; compared on its words only
+        facts = set()
+        for fragment in re.split(r"(?<=[.!?])\s+|\\n|\n|\"", re.sub(r"https?://\S+", " ", text)):
+            words = re.findall(r"[a-z0-9]+", fragment.lower())
+            if len(words) >= 6:
+                facts.add("fact:" + " ".join(words))
+        return urls | facts
+
+    def observe(self, result):
+        """Record a result and return its novelty (share of new items, 0..1)"""
+        items = self.items(result)
+        novelty = len(items - self.seen) / len(items) if items else 0.0
+        self.seen |= items
+        self.history.append(novelty)
+        recent = self.history[-self.patience:]
+        if len(self.history) >= MIN_OBSERVATIONS and all(value < self.floor for value in recent):
+            self.exhausted = True
+        return novelty
+
+
+@contextmanager
+def run_budget(profile=None):
+    """Make a budget active for everything in the block; nested calls reuse the outer one.
+
+    Without a profile (and no RESEARCH_BUDGET), nothing is enforced.
+    """
+    if not BUDGET_ENABLED or not (profile or DEFAULT_PROFILE):
+        yield None
+        return
+    if _run_budget.get() is not None:
+        yield _run_budget.get()
+        return
+    budget = RunBudget(get_profile(profile))
+    token = _run_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _run_budget.reset(token)
+
+
+@contextmanager
+def agent_budget(role):
+    """Track the novelty of tool results for one agent's task"""
+    budget = _run_budget.get()
+    if budget is None:
+        yield None
+        return
+    profile = budget.profile
+    tracker = NoveltyTracker(role, profile["novelty_floor"], profile["patience"], profile["max_execution_time"])
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def charge(tokens):
+    """Count LLM tokens against the active run's budget"""
+    budget = _run_budget.get()
+    if budget is not None:
+        budget.charge(tokens)
+
+
+def refusal():
+    """The message a tool should return instead of running, or None if it may run"""
+    budget = _run_budget.get()
+    tracker = _tracker.get()
+    if budget is not None and budget.spent():
+        return EXHAUSTED_MESSAGE.format(reason=f"the run's {budget.profile['token_budget']} token budget is spent")
+    if tracker is not None and time.monotonic() > tracker.deadline:
+        return EXHAUSTED_MESSAGE.format(reason=f"this step's {budget.profile['max_execution_time']}s time limit is up")
+    if tracker is not None and tracker.exhausted:
+        return EXHAUSTED_MESSAGE.format(reason="recent searches found almost nothing new")
+    return None
+
+
+def review(result):
+    """Score a tool result; once returns diminish, append the instruction to finalize"""
+    tracker = _tracker.get()
+    if tracker is None or tracker.exhausted:
+        return result
+    novelty = tracker.observe(result)
+    if not tracker.exhausted:
+        return result
+    event("budget", tracker.role, novelty=round(novelty, 3), searches=len(tracker.history))
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    return f"{text}\n\n" + EXHAUSTED_MESSAGE.format(reason="these results add almost nothing new")
@@ -0,0 +1,146 @@
+"""Keeps the upstream output handed to a task as context within a token budget.
+
+Above the budget, repeated paragraphs are dropped first; if that is not enough, only the
+chunks most relevant to the downstream task are kept (or, in "summarize" mode, those
+chunks are summarized by the task's own model). The result replaces the task's context
+through a stand-in task whose output is already set, so crewai builds its prompt as usual.
+"""
+import math
+import os
+import re
+from common.rate_limit import estimate_tokens
+from common.tracing import span
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 6000))
+CONTEXT_BUDGET_MODE = os.getenv("CONTEXT_BUDGET_MODE", "extract")
+
+# Paragraphs longer than this are split further so relevance is judged on smaller pieces
+MAX_CHUNK_TOKENS = 300
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "will", "have",
+    "has", "had", "not", "but", "all", "any", "can", "into", "its", "their", "them", "they",
+    "you", "your", "our", "about", "which", "what", "when", "where", "who", "how", "also",
+    "been", "such", "than", "then", "these", "those", "each", "more", "most", "other",
+}
+
+
+def split_chunks(text):
+    """Split on blank lines, then on lines, then on sentences until chunks are small enough"""
+    chunks = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= MAX_CHUNK_TOKENS:
+            chunks.append(paragraph)
+            continue
+        current = ""
+        for piece in re.split(r"(?<=[.!?])\s+|\n", paragraph):
+            if current and estimate_tokens(current) + estimate_tokens(piece) > MAX_CHUNK_TOKENS:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {piece}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _terms(text):
+    return [term for term in re.findall(r"[a-z0-9]{3,}", text.lower()) if term not in STOPWORDS]
+
+
+def dedupe(chunks):
+    """Drop chunks whose words repeat an earlier chunk (case, punctuation and spacing ignored)"""
+    seen = set()
+    unique = []
+    for label, chunk in chunks:
+        key = " ".join(re.findall(r"\w+", chunk.lower()))
+        if key and key not in seen:
+            seen.add(key)
+            unique.append((label, chunk))
+    return unique
+
+
+def select_relevant(chunks, query, budget):
+    """Keep the chunks sharing the rarest terms with ``query`` up to ``budget`` tokens, in their original order"""
+    chunk_terms = [set(_terms(chunk)) for _, chunk in chunks]
+    query_terms = set(_terms(query))
+    document_frequency = {}
+    for terms in chunk_terms:
+        for term in terms & query_terms:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    def score(index):
+        terms = chunk_terms[index]
+        matched = sum(math.log(1 + len(chunks) / document_frequency[term]) for term in terms & query_terms)
+        # Earlier chunks win ties, since reports usually lead with their key findings
+        return matched / math.log(2 + len(terms)), -index
+
+    kept = set()
+    used = 0
+    for index in sorted(range(len(chunks)), key=score, reverse=True):
+        tokens = estimate_tokens(chunks[index][1])
+        if used + tokens <= budget:
+            kept.add(index)
+            used += tokens
+    return [chunk for index, chunk in enumerate(chunks) if index in kept]
+
+
+def _format(chunks):
+    sections = {}
+    for label, chunk in chunks:
+        sections.setdefault(label, []).append(chunk)
+    return "\n\n".join(f"## {label}\n\n" + "\n\n".join(parts) for label, parts in sections.items())
+
+
+def summarize(llm, text, query, budget):
+    prompt = (
+        f"Condense the notes below to at most {budget * 3 // 4} words for someone who must: {query}\n"
+        "Keep every fact, figure, name and source URL they would need; drop repetition and filler.\n\n"
+        f"{text}"
+    )
+    return llm.call([{"role": "user", "content": prompt}])
+
+
+def compress(outputs, query, budget, mode=CONTEXT_BUDGET_MODE, llm=None):
+    """Fit ``outputs`` ([(label, text)]) into ``budget`` tokens; returns None if they already fit"""
+    if sum(estimate_tokens(text) for _, text in outputs) <= budget:
+        return None
+    chunks = dedupe([(label, chunk) for label, text in outputs for chunk in split_chunks(text)])
+    if sum(estimate_tokens(chunk) for _, chunk in chunks) <= budget:
+        return _format(chunks)
+    if mode == "summarize" and llm is not None and hasattr(llm, "call"):
+        # Give the summarizer more to work with than the budget, but still a bounded amount
+        summary = summarize(llm, _format(select_relevant(chunks, query, budget * 3)), query, budget)
+        if isinstance(summary, str) and estimate_tokens(summary) <= budget:
+            return summary
+    return _format(select_relevant(chunks, query, budget))
+
+
+def budget_context(task, budget=CONTEXT_TOKEN_BUDGET, mode=CONTEXT_BUDGET_MODE):
+    """Return a one-task context list holding the compressed upstream output, or None if it fits"""
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    upstream = [dep for dep in task.context or [] if dep.output is not None]
+    if not budget or not upstream:
+        return None
+    outputs = [(dep.agent.role if dep.agent else dep.description[:60], dep.output.raw) for dep in upstream]
+    before = sum(estimate_tokens(text) for _, text in outputs)
+    if before <= budget:
+        return None
+
+    with span("context", task.agent.role, tokens_before=before, mode=mode) as record:
+        query = f"{task.description}\n{task.expected_output}"
+        text = compress(outputs, query, budget, mode, getattr(task.agent, "llm", None))
+        record["tokens_after"] = estimate_tokens(text)
+
+    labels = ", ".join(label for label, _ in outputs)
+    proxy = Task(
+        description=f"Condensed output of: {labels}",
+        expected_output="The parts of the upstream output relevant to the next task",
+    )
+    proxy.output = TaskOutput(description=proxy.description, raw=text, agent=labels)
+    print(f"Context for '{task.agent.role}' condensed from ~{before} to ~{record['tokens_after']} tokens")
+    return [proxy]
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from common.disk_cache import cache_path
+from common.docx_stream import EXTRACTOR_VERSION
+
+DOC_CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """Plain text extracted from documents, stored as one UTF-8 file per document content.
+
+    Entries are found by path, size and mtime, falling back to the content hash, so a
+    moved or touched file still hits. The extractor version is part of each entry's key,
+    so text extracted by an older version is never served. Entry sizes and access times
+    are kept in a SQLite index next to the text files, and the least recently used
+    entries are evicted past a size cap.
+    """
+
+    def __init__(self, directory, max_bytes=DOC_CACHE_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                hash TEXT NOT NULL
+            )"""
+        )
+        self._drop_offsets_table()
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                hash TEXT PRIMARY KEY,
+                bytes INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def _drop_offsets_table(self):
+        # Caches written before paragraph offsets were dropped hold only text from the
+        # previous extractor version, which is never served again; remove it all
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "offsets" not in columns:
+            return
+        for (digest,) in self._conn.execute("SELECT hash FROM entries").fetchall():
+            try:
+                os.remove(self._text_path(digest))
+            except OSError:
+                pass
+        self._conn.execute("DROP TABLE entries")
+
+    def _text_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.txt")
+
+    def content_hash(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM files WHERE path = ? AND size = ? AND mtime = ?",
+                (path, stat.st_size, stat.st_mtime),
+            ).fetchone()
+        if row:
+            return row[0]
+        digest = file_hash(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, hash) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, digest),
+            )
+            self._conn.commit()
+        return digest
+
+    def entry_key(self, path):
+        return f"{self.content_hash(path)}-v{EXTRACTOR_VERSION}"
+
+    def open_text(self, path):
+        """Open the cached text of a document for binary reading, or return None on a miss"""
+        digest = self.entry_key(path)
+        with self._lock:
+            found = self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE hash = ?", (time.time(), digest)
+            ).rowcount
+            self._conn.commit()
+        if found:
+            try:
+                text_file = open(self._text_path(digest), "rb")
+                self.hits += 1
+                return text_file
+            except OSError:
+                self._forget(digest)
+        self.misses += 1
+        return None
+
+    def iter_and_store(self, path, paragraphs):
+        """Pass paragraphs through while writing them to the cache.
+
+        The entry is only committed once the paragraphs are exhausted; a consumer that
+        stops early (e.g. a cancelled load) leaves nothing behind.
+        """
+        digest = self.entry_key(path)
+        final_path = self._text_path(digest)
+        tmp_path = f"{final_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        position = 0
+        try:
+            with open(tmp_path, "wb") as out:
+                for index, paragraph in enumerate(paragraphs):
+                    if index:
+                        out.write(b"\n")
+                        position += 1
+                    data = paragraph.encode("utf-8")
+                    out.write(data)
+                    position += len(data)
+                    yield paragraph
+            os.replace(tmp_path, final_path)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (hash, bytes, accessed_at) VALUES (?, ?, ?)",
+                    (digest, position, time.time()),
+                )
+                self._evict()
+                self._conn.commit()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _forget(self, digest):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE hash = ?", (digest,))
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in self._conn.execute("SELECT hash, bytes FROM entries ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE hash = ?", (digest,))
+            self._conn.execute("DELETE FROM files WHERE hash = ?", (digest.split("-")[0],))
+            try:
+                os.remove(self._text_path(digest))
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache():
+    """Return the process-wide document cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DocumentCache(cache_path("documents"))
+        return _cache
@@ -0,0 +1,77 @@
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Bump whenever the extracted text changes, so cached extractions are redone
+EXTRACTOR_VERSION = 2
+
+
+def _document_parts(zf):
+    names = zf.namelist()
+    headers = sorted(n for n in names if re.fullmatch(r"word/header\d*\.xml", n))
+    footers = sorted(n for n in names if re.fullmatch(r"word/footer\d*\.xml", n))
+    return headers + ["word/document.xml"] + footers
+
+
+def _paragraph_text(paragraph):
+    parts = []
+    # Only run content counts: w:pPr also holds w:tab elements, but those define tab stops
+    for run in paragraph.iter(W + "r"):
+        for node in run:
+            if node.tag == W + "t" and node.text:
+                parts.append(node.text)
+            elif node.tag == W + "tab":
+                parts.append("\t")
+            elif node.tag in (W + "br", W + "cr"):
+                parts.append("\n")
+    return "".join(parts)
+
+
+def _iter_part(stream):
+    # Elements are cleared and detached as soon as they are consumed, so memory stays
+    # bounded by the largest paragraph or table row rather than the whole part
+    stack = []
+    rows = []
+    cells = []
+    for event, elem in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == W + "tr":
+                rows.append([])
+            elif elem.tag == W + "tc":
+                cells.append([])
+            continue
+
+        stack.pop()
+        line = None
+        if elem.tag == W + "p":
+            line = _paragraph_text(elem)
+        elif elem.tag == W + "tc":
+            rows[-1].append(" ".join(t for t in cells.pop() if t))
+        elif elem.tag == W + "tr":
+            line = "\t".join(rows.pop())
+        else:
+            continue
+
+        if line is not None:
+            if cells:
+                cells[-1].append(line)
+            else:
+                yield line
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def iter_paragraphs(path):
+    """Yield the text of a .docx paragraph by paragraph without loading the whole document.
+
+    Headers come first, then the body, then footers. Each table row is yielded as one
+    tab-separated line.
+    """
+    with zipfile.ZipFile(path) as zf:
+        for name in _document_parts(zf):
+            with zf.open(name) as stream:
+                yield from _iter_part(stream)
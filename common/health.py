@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+
+OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+
+class HealthProbe:
+    """Reachability check for an HTTP endpoint with a cached result and background refresh.
+
+    Uses a pooled session and short timeouts, so a filtered port costs at most a second
+    and never blocks callers that only read the cached status.
+    """
+
+    def __init__(self, url, ttl=15.0, timeout=(0.5, 1.0)):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._status = None
+        self._checked_at = 0.0
+        self._refreshing = False
+
+    def check(self):
+        """Probe the endpoint now and update the cached status"""
+        # Imported here so the agents can show their first prompt without loading requests
+        import requests
+        if self._session is None:
+            self._session = requests.Session()
+        try:
+            ok = self._session.get(self.url, timeout=self.timeout).status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        with self._lock:
+            self._status = ok
+            self._checked_at = time.monotonic()
+            self._refreshing = False
+        self._done.set()
+        return ok
+
+    def refresh(self):
+        """Start a background probe unless one is running or the cached status is fresh"""
+        with self._lock:
+            fresh = self._status is not None and time.monotonic() - self._checked_at < self.ttl
+            if fresh or self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.check, daemon=True).start()
+
+    def status(self):
+        """Last known status (None until the first probe finishes); never blocks"""
+        self.refresh()
+        return self._status
+
+    def is_available(self, wait=2.0):
+        """Like status(), but waits up to ``wait`` seconds for the first probe to finish"""
+        self.refresh()
+        if self._status is None:
+            self._done.wait(wait)
+        return bool(self._status)
+
+
+ollama_probe = HealthProbe(f"{OLLAMA_URL}/api/version")
@@ -0,0 +1,221 @@
+"""Batched ingestion of web pages into the Chroma store used by WebsiteSearchTool.
+
+Pages are fetched concurrently, split into chunks, embedded in large batches and written
+to the store in bulk, instead of one embedding call per document:
+
+    python -m common.ingest urls.txt --batch-size 256 --concurrency 8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+import requests
+from common.rate_limit import estimate_tokens, get_rate_limiter
+from common.tracing import span
+from common.website import get_page_index, get_website_tool
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 256))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", 8))
+CHUNK_SIZE = 2000
+WRITE_BATCH = 1000
+
+_write_lock = threading.Lock()
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    return " ".join(" ".join(extractor.parts).split())
+
+
+def chunk_text(text, size=CHUNK_SIZE):
+    """Split on word boundaries into chunks of at most ``size`` characters"""
+    chunks = []
+    current = []
+    length = 0
+    for word in text.split(" "):
+        if current and length + len(word) + 1 > size:
+            chunks.append(" ".join(current))
+            current, length = [], 0
+        current.append(word)
+        length += len(word) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _fetch(url, collection):
+    """Return (url, fresh, validators, text, error)"""
+    try:
+        fresh, validators, body = get_page_index().check(url, collection)
+    except requests.exceptions.RequestException as e:
+        return url, False, None, None, str(e)
+    if fresh:
+        return url, True, validators, None, None
+    text = html_to_text(body.decode("utf-8", errors="replace"))
+    return url, False, validators, text, None if text else "the page has no text content"
+
+
+class _Target:
+    """The collection, app id and embedder the website tool itself searches with.
+
+    Chunks written anywhere else, or embedded by another model, would never be found by
+    the tool, so these are read from its embedchain app rather than assumed.
+    """
+
+    def __init__(self, tool):
+        app = getattr(getattr(tool, "adapter", None), "embedchain_app", None)
+        collection = getattr(getattr(app, "db", None), "collection", None)
+        embedder = getattr(app, "embedding_model", None)
+        if collection is None or getattr(embedder, "embedding_fn", None) is None:
+            raise RuntimeError(
+                f"Cannot ingest pages for {type(tool).__name__}: its adapter does not expose an embedchain "
+                "app with a Chroma collection and embedder, so chunks could not be written where it searches"
+            )
+        self.collection = collection
+        self.app_id = getattr(app.config, "id", None)
+        self.embedder = embedder
+        name = type(embedder).__name__.lower()
+        self.provider = "openai" if "openai" in name else "ollama" if "ollama" in name else None
+
+    def chunk_id(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{self.app_id}--{digest}" if self.app_id else digest
+
+    def embed(self, texts):
+        if self.provider:
+            get_rate_limiter().acquire(self.provider, sum(estimate_tokens(text) for text in texts))
+        return [list(vector) for vector in self.embedder.embedding_fn(texts)]
+
+
+def ingest_urls(urls, batch_size=EMBED_BATCH_SIZE, concurrency=INGEST_CONCURRENCY, tool=None):
+    """Fetch, chunk, embed and store the given pages; unchanged pages are skipped.
+
+    Pages go into the store of ``tool`` (default: the shared website search tool).
+    Returns a dict with the number of pages reused/embedded/failed, chunks written,
+    embedding requests made and the reason each failed page could not be read. If the
+    tool's store cannot be reached, nothing is ingested and every URL is listed under
+    "skipped", for the tool's own add() to handle.
+    """
+    urls = list(dict.fromkeys(urls))
+    with span("ingest", "web_pages") as record:
+        try:
+            target = _Target(tool or get_website_tool())
+        except RuntimeError as e:
+            stats = _empty_stats()
+            stats.update(skipped=urls, skip_reason=str(e))
+        else:
+            stats = _ingest(urls, batch_size, concurrency, target)
+        record.update({key: value for key, value in stats.items() if key in ("reused", "embedded", "failed", "chunks")})
+        record["skipped"] = len(stats["skipped"])
+        return stats
+
+
+def _empty_stats():
+    return {"reused": 0, "embedded": 0, "failed": 0, "chunks": 0, "embedding_requests": 0, "errors": {}, "skipped": []}
+
+
+def _ingest(urls, batch_size, concurrency, target):
+    stats = _empty_stats()
+    index = get_page_index()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        fetched = list(pool.map(lambda url: _fetch(url, target.collection), urls))
+
+    # Chunks from every page share the same embedding batches
+    ids, documents, metadatas = [], [], []
+    pages = []
+    for url, fresh, validators, text, error in fetched:
+        if fresh:
+            stats["reused"] += 1
+            index.reused += 1
+            continue
+        if error:
+            stats["failed"] += 1
+            stats["errors"][url] = error
+            continue
+        pages.append((url, validators))
+        for chunk in chunk_text(text):
+            ids.append(target.chunk_id(chunk + url))
+            documents.append(chunk)
+            metadata = {"url": url, "data_type": "web_page", "doc_id": target.chunk_id(url), "hash": validators[2]}
+            if target.app_id:
+                metadata["app_id"] = target.app_id
+            metadatas.append(metadata)
+    if not pages:
+        return stats
+
+    collection = target.collection
+    batches = [documents[start:start + batch_size] for start in range(0, len(documents), batch_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        embeddings = [vector for batch in pool.map(target.embed, batches) for vector in batch]
+    stats["embedding_requests"] = len(batches)
+
+    with _write_lock:
+        # Replace earlier versions of changed pages rather than piling up stale chunks
+        for url, _ in pages:
+            collection.delete(where={"url": url})
+        for start in range(0, len(ids), WRITE_BATCH):
+            end = start + WRITE_BATCH
+            collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+            )
+
+    for url, validators in pages:
+        index.mark_embedded(url, validators)
+    index.embedded += len(pages)
+    stats["embedded"] = len(pages)
+    stats["chunks"] = len(ids)
+    return stats
+
+
+def format_stats(stats):
+    if stats["skipped"]:
+        return f"Skipped batch ingestion of {len(stats['skipped'])} pages: {stats['skip_reason']}"
+    line = (f"Ingested {stats['embedded']} pages ({stats['chunks']} chunks, "
+            f"{stats['embedding_requests']} embedding requests), {stats['reused']} unchanged, "
+            f"{stats['failed']} failed")
+    return "\n".join([line] + [f"  could not read {url}: {error}" for url, error in stats["errors"].items()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch and embed web pages into the local Chroma store")
+    parser.add_argument("urls", nargs="?", default="-", help="file with one URL per line (default: stdin)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="chunks per embedding request")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY, help="parallel fetches and embedding requests")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.urls == "-" else open(args.urls, encoding="utf-8")
+    with stream:
+        urls = [line.strip() for line in stream if line.strip() and not line.startswith("#")]
+    print(format_stats(ingest_urls(urls, args.batch_size, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Deferred, timed imports so the interactive agents can prompt before loading crewai.
+
+Set IMPORT_REPORT=1 to print how long startup and each deferred import took.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+
+IMPORT_REPORT = os.getenv("IMPORT_REPORT", "").lower() in ("1", "true", "yes")
+
+_started = time.perf_counter()
+_marks = []
+_timings = {}
+_lock = threading.Lock()
+
+
+def timed_import(name):
+    """Import a module, recording how long it took the first time"""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        _timings.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def _preload(names):
+    for name in names:
+        try:
+            timed_import(name)
+        except Exception:
+            # The real import later on raises (and reports) the same error
+            pass
+
+
+def preload(*names):
+    """Import modules on a background thread, e.g. while the user answers a prompt.
+
+    Later ``import`` statements for the same modules wait for (or reuse) this import.
+    """
+    thread = threading.Thread(target=_preload, args=([name for name in names if name],), daemon=True)
+    thread.start()
+    return thread
+
+
+def agent_modules(use_gpt, *extra):
+    """The modules an agent script needs once it knows which model the user picked"""
+    client = "langchain_openai" if use_gpt else "langchain_community.llms"
+    return ["crewai", client, "common.search", "common.llm", *extra]
+
+
+def mark(label):
+    """Record the time since startup at a milestone such as the first prompt"""
+    with _lock:
+        _marks.append((label, time.perf_counter() - _started))
+
+
+def import_report():
+    lines = [f"{label}: {seconds:.2f}s after startup" for label, seconds in _marks]
+    for name, seconds in sorted(_timings.items(), key=lambda item: -item[1]):
+        lines.append(f"  import {name}: {seconds:.2f}s")
+    return "Import timings:\n" + "\n".join(lines)
+
+
+def print_import_report():
+    if IMPORT_REPORT:
+        print(import_report())
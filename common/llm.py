@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+from crewai import LLM
+from common.disk_cache import DiskCache, cache_path, make_key
+from common.budget import BUDGET_ENABLED, DEFAULT_PROFILE, charge
+from common.rate_limit import estimate_tokens, get_rate_limiter
+from common.tracing import TRACE_ENABLED, span
+
+# Opt in with LLM_CACHE=1; replays identical prompts from disk instead of calling the provider
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                cache_path("llm.sqlite3"),
+                max_bytes=LLM_CACHE_MAX_BYTES,
+                default_ttl=LLM_CACHE_TTL,
+            )
+        return _cache
+
+
+# crewai LLM argument -> the attributes LangChain and crewai clients keep that setting in
+CLIENT_SETTINGS = {
+    "temperature": ("temperature",),
+    "base_url": ("base_url", "openai_api_base", "api_base"),
+    "api_key": ("api_key", "openai_api_key"),
+    "api_version": ("api_version", "openai_api_version"),
+    "timeout": ("timeout", "request_timeout"),
+    "max_tokens": ("max_tokens", "num_predict"),
+    "top_p": ("top_p",),
+    "n": ("n",),
+    "stop": ("stop",),
+    "seed": ("seed",),
+    "presence_penalty": ("presence_penalty",),
+    "frequency_penalty": ("frequency_penalty",),
+    "reasoning_effort": ("reasoning_effort",),
+}
+
+
+def client_settings(llm):
+    """The settings of a client that carry over to a crewai LLM"""
+    settings = {}
+    for name, attributes in CLIENT_SETTINGS.items():
+        for attribute in attributes:
+            value = getattr(llm, attribute, None)
+            if hasattr(value, "get_secret_value"):
+                value = value.get_secret_value()
+            # e.g. an httpx.Timeout object, which crewai cannot take
+            if name == "timeout" and not isinstance(value, (int, float)):
+                value = None
+            if value is not None:
+                settings[name] = value
+                break
+    return settings
+
+
+def provider_for(model):
+    """Provider name used for rate limits, e.g. 'ollama/llama3.1' -> 'ollama'"""
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+
+class ManagedLLM(LLM):
+    """CrewAI LLM that goes through the shared rate limiter and, optionally, the response cache"""
+
+    def __init__(self, *args, use_cache=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_cache = use_cache
+
+    def call(self, messages, tools=None, *args, **kwargs):
+        # Function-calling turns execute tools as a side effect, so never replay them
+        cacheable = self.use_cache and not (tools or kwargs.get("tools") or kwargs.get("available_functions"))
+        tokens_in = estimate_tokens(messages)
+        with span("llm", self.model, tokens_in=tokens_in) as record:
+            if cacheable:
+                key = make_key("llm", self.model, self.temperature, messages)
+                cached = get_llm_cache().get(key)
+                if cached is not None:
+                    result = json.loads(cached)
+                    record.update(cache_hit=1, tokens_in=0, tokens_out=0)
+                    return result
+
+            provider = provider_for(self.model)
+            limiter = get_rate_limiter()
+            limiter.acquire(provider, tokens_in)
+            result = super().call(messages, tools, *args, **kwargs)
+            record["tokens_out"] = estimate_tokens(result)
+            limiter.record(provider, record["tokens_out"])
+            charge(tokens_in + record["tokens_out"])
+
+            if cacheable and isinstance(result, str):
+                get_llm_cache().set(key, json.dumps(result))
+            return result
+
+
+def wrap_llm(llm, use_cache=None, budgeted=False):
+    """Return a ManagedLLM equivalent to a ChatOpenAI, Ollama or crewai LLM instance.
+
+    Pass ``budgeted=True`` for agents that run under a research budget, which needs
+    every call's tokens. Tracing is on by default, so clients are normally converted;
+    model, credentials, endpoint, timeout and sampling settings carry over (see
+    CLIENT_SETTINGS). The original object is returned untouched only when caching,
+    tracing, a research budget and a rate limit for its provider are all off.
+    """
+    use_cache = LLM_CACHE_ENABLED if use_cache is None else use_cache
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    if "ollama" in type(llm).__name__.lower() and not model.startswith("ollama/"):
+        model = f"ollama/{model}"
+    budget = BUDGET_ENABLED and (budgeted or DEFAULT_PROFILE)
+    if not (use_cache or TRACE_ENABLED or budget) and provider_for(model) not in get_rate_limiter().limits:
+        return llm
+
+    return ManagedLLM(use_cache=use_cache, model=model, **client_settings(llm))
+
+
+def llm_cache_summary():
+    if not LLM_CACHE_ENABLED:
+        return "LLM cache: disabled (set LLM_CACHE=1 to enable)"
+    return get_llm_cache().summary("LLM cache")
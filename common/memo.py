@@ -0,0 +1,80 @@
+"""Run-scoped memo for tool calls: identical calls within one run share a single result.
+
+Unlike the disk caches this has no TTL and lives only as long as the run. Concurrent
+identical calls (e.g. two agents in parallel tasks issuing the same search) are coalesced:
+the first one runs, the others wait for its result.
+"""
+import contextvars
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from common.disk_cache import make_key
+from common.tracing import current_run, span
+
+_current_memo = contextvars.ContextVar("tool_memo", default=None)
+
+
+class RunMemo:
+    def __init__(self):
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def call(self, name, key, fn):
+        """Return fn()'s result, running it only once per key for the lifetime of the memo"""
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+                self.misses += 1
+            elif future.done():
+                self.hits += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            with span("memo", name, cache_hit=1):
+                return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            # Don't remember failures: the next identical call gets to try again
+            with self._lock:
+                del self._results[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def summary(self):
+        return (f"Tool memo: {self.hits} repeated calls answered from this run, "
+                f"{self.coalesced} concurrent duplicates coalesced, {self.misses} distinct calls")
+
+
+@contextmanager
+def run_memo():
+    """Share tool results within the block; nested calls reuse the outer memo"""
+    if _current_memo.get() is not None:
+        yield _current_memo.get()
+        return
+    memo = RunMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+        run = current_run()
+        if run is not None and memo.misses:
+            run.notes.append(memo.summary())
+
+
+def memoized(name, key_parts, fn):
+    """Call fn() through the active run's memo, or directly when no run is active"""
+    memo = _current_memo.get()
+    if memo is None:
+        return fn()
+    return memo.call(name, make_key(name, *key_parts), fn)
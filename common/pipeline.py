@@ -0,0 +1,192 @@
+import contextvars
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from crewai import Crew
+from crewai.tasks.task_output import TaskOutput
+from common.budget import agent_budget, run_budget
+from common.context_budget import CONTEXT_TOKEN_BUDGET, budget_context
+from common.disk_cache import cache_path, make_key
+from common.memo import run_memo
+from common.tracing import event, record_step, span, trace_run
+
+# Older checkpoints are ignored (outputs such as "mentions in the last 24 hours" go stale)
+# and abandoned run directories are deleted
+CHECKPOINT_MAX_AGE = int(os.getenv("CHECKPOINT_MAX_AGE", 6 * 60 * 60))
+
+
+def prune_checkpoints(root, max_age):
+    """Delete run directories under ``root`` that have not been written for ``max_age`` seconds"""
+    cutoff = time.time() - max_age
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class CheckpointStore:
+    """Persists each finished task's output so a failed run can resume where it stopped"""
+
+    def __init__(self, run_id, max_age=CHECKPOINT_MAX_AGE):
+        root = cache_path("checkpoints")
+        os.makedirs(root, exist_ok=True)
+        prune_checkpoints(root, max_age)
+        self.dir = os.path.join(root, run_id)
+        self.max_age = max_age
+
+    @classmethod
+    def for_tasks(cls, name, tasks, *parts):
+        # Changing any prompt gives the run a new id, so stale outputs are never reused
+        return cls(f"{name}-{make_key([t.description for t in tasks], *parts)[:16]}")
+
+    def _path(self, index):
+        return os.path.join(self.dir, f"task_{index}.json")
+
+    def load(self, index, task):
+        try:
+            with open(self._path(index), encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("description") != task.description:
+            return None
+        if time.time() - saved.get("saved_at", 0) > self.max_age:
+            return None
+        return saved["raw"]
+
+    def save(self, index, task):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_path = self._path(index) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"description": task.description, "raw": task.output.raw, "saved_at": time.time()}, f)
+        os.replace(tmp_path, self._path(index))
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def _resolve_context(tasks):
+    # Tasks without an explicit context see every earlier task, like Process.sequential
+    for index, task in enumerate(tasks):
+        if not isinstance(task.context, list):
+            task.context = tasks[:index]
+
+
+def _run_task(task, max_retries, backoff, verbose, context_budget):
+    role = task.agent.role
+    original_context = task.context
+    with span("task", role) as record, agent_budget(role):
+        # Swapped back afterwards, so the task list can be run again as written
+        task.context = budget_context(task, context_budget) or original_context
+        try:
+            return _attempt_task(task, record, max_retries, backoff, verbose)
+        finally:
+            task.context = original_context
+
+
+def _attempt_task(task, record, max_retries, backoff, verbose):
+    role = task.agent.role
+    for attempt in range(max_retries):
+        start = time.perf_counter()
+        try:
+            Crew(agents=[task.agent], tasks=[task], verbose=verbose, step_callback=record_step).kickoff()
+            return time.perf_counter() - start
+        except Exception as e:
+            print(f"Task '{role}' attempt {attempt + 1} failed: {str(e)}")
+            if attempt == max_retries - 1:
+                raise
+            record["retries"] = attempt + 1
+            delay = backoff * 2 ** attempt
+            print(f"Retrying '{role}' in {delay:.0f}s...")
+            time.sleep(delay)
+
+
+def _dependencies(tasks):
+    # Context tasks outside this list are expected to carry their output already
+    positions = {id(task): index for index, task in enumerate(tasks)}
+    return [
+        {positions[id(dep)] for dep in task.context if id(dep) in positions}
+        for task in tasks
+    ]
+
+
+def run_pipeline(tasks, store=None, max_retries=3, backoff=1.0, verbose=True, max_workers=4,
+                 on_task_complete=None, context_budget=CONTEXT_TOKEN_BUDGET, budget=None):
+    """Run tasks as a dependency graph, checkpointing each output and retrying only the step that fails.
+
+    Each task's ``context`` list defines what it waits for, so independent tasks run
+    concurrently on a thread pool; tasks without one follow every earlier task, as in
+    Process.sequential. Tasks already saved in the store are skipped and their output is
+    fed to later tasks as context. Returns the output of the last task.
+
+    ``on_task_complete(task, output, seconds)`` is called on the calling thread as soon as
+    each task finishes, so callers can show partial results while the rest is running.
+
+    Upstream output beyond ``context_budget`` tokens is condensed before it is handed to
+    a task (see common.context_budget); pass 0 to always hand it over in full.
+
+    ``budget`` names a profile in common.budget (default: RESEARCH_BUDGET); its token
+    budget covers the whole run, and each task's searches stop once they find little new.
+    Identical tool calls within the run share one result (see common.memo).
+
+    Tasks, LLM and tool calls are traced (see common.tracing) as part of the caller's
+    run, or as a run of their own when none is active.
+    """
+    with trace_run("pipeline"), run_budget(budget), run_memo():
+        return _run_graph(tasks, store, max_retries, backoff, verbose, max_workers, on_task_complete, context_budget)
+
+
+def _run_graph(tasks, store, max_retries, backoff, verbose, max_workers, on_task_complete, context_budget):
+    _resolve_context(tasks)
+    dependencies = _dependencies(tasks)
+    finished = set()
+    for index, task in enumerate(tasks):
+        saved = store.load(index, task) if store else None
+        if saved is not None:
+            task.output = TaskOutput(description=task.description, raw=saved, agent=task.agent.role)
+            finished.add(index)
+            print(f"Resuming: reusing saved output of '{task.agent.role}'")
+            event("task", task.agent.role, resumed=True)
+            if on_task_complete:
+                on_task_complete(task, task.output, 0.0)
+
+    pending = [index for index in range(len(tasks)) if index not in finished]
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            if error is None:
+                for index in [i for i in pending if dependencies[i] <= finished]:
+                    pending.remove(index)
+                    # Each worker gets a copy of the caller's context, so its spans join the current run
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, _run_task, tasks[index], max_retries, backoff, verbose,
+                                         context_budget)] = index
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    # Let tasks already in flight finish and checkpoint before giving up
+                    error = error or e
+                    continue
+                finished.add(index)
+                if store:
+                    store.save(index, tasks[index])
+                if on_task_complete:
+                    on_task_complete(tasks[index], tasks[index].output, seconds)
+
+    if error is not None:
+        raise error
+    if store:
+        store.clear()
+    return tasks[-1].output
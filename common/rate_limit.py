@@ -0,0 +1,122 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from common.disk_cache import cache_path
+
+PROVIDERS = ("openai", "ollama", "serper")
+
+
+def estimate_tokens(value):
+    """Rough token count for rate limiting; about four characters per token"""
+    return math.ceil(len(str(value)) / 4)
+
+
+def limits_from_env():
+    """Read OPENAI_RPM, OPENAI_TPM, SERPER_RPM, ... into {provider: {"rpm": n, "tpm": n}}"""
+    limits = {}
+    for provider in PROVIDERS:
+        for kind in ("rpm", "tpm"):
+            value = os.getenv(f"{provider.upper()}_{kind.upper()}")
+            if value:
+                limits.setdefault(provider, {})[kind] = float(value)
+    return limits
+
+
+class RateLimiter:
+    """Per-provider token buckets for requests and tokens per minute.
+
+    Bucket levels live in SQLite, so every crew and every process on the machine draws
+    from the same budget. Callers wait for capacity instead of failing.
+    """
+
+    def __init__(self, path, limits):
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS buckets (
+                provider TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (provider, kind)
+            )"""
+        )
+
+    def acquire(self, provider, tokens=0):
+        """Block until one request and ``tokens`` tokens are available for the provider"""
+        limits = self.limits.get(provider)
+        if not limits:
+            return
+        # A single request larger than the whole budget can only wait for a full bucket
+        wanted = {"rpm": 1, "tpm": tokens}
+        wanted = {kind: min(amount, limits[kind]) for kind, amount in wanted.items() if kind in limits}
+        while True:
+            delay = self._take(provider, wanted)
+            if delay <= 0:
+                return
+            time.sleep(min(delay, 5))
+
+    def record(self, provider, tokens):
+        """Charge tokens that were only known after the call, e.g. the completion"""
+        limits = self.limits.get(provider)
+        if not limits or "tpm" not in limits or not tokens:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                level = self._refill(provider, "tpm", limits["tpm"], time.time())
+                self._store(provider, "tpm", level - tokens, time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _take(self, provider, wanted):
+        now = time.time()
+        limits = self.limits[provider]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {kind: self._refill(provider, kind, limits[kind], now) for kind in wanted}
+                missing = {kind: wanted[kind] - levels[kind] for kind in wanted if levels[kind] < wanted[kind]}
+                if missing:
+                    self._conn.execute("ROLLBACK")
+                    return max(amount * 60.0 / limits[kind] for kind, amount in missing.items())
+                for kind, amount in wanted.items():
+                    self._store(provider, kind, levels[kind] - amount, now)
+                self._conn.execute("COMMIT")
+                return 0
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _refill(self, provider, kind, capacity, now):
+        row = self._conn.execute(
+            "SELECT level, updated_at FROM buckets WHERE provider = ? AND kind = ?", (provider, kind)
+        ).fetchone()
+        if row is None:
+            return capacity
+        level, updated_at = row
+        return min(capacity, level + (now - updated_at) * capacity / 60.0)
+
+    def _store(self, provider, kind, level, now):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO buckets (provider, kind, level, updated_at) VALUES (?, ?, ?, ?)",
+            (provider, kind, level, now),
+        )
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter configured from the environment"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(cache_path("rate_limits.sqlite3"), limits_from_env())
+        return _limiter
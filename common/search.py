@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+from crewai_tools import SerperDevTool
+from common.disk_cache import DiskCache, cache_path, make_key
+from common.memo import memoized
+from common.budget import refusal, review
+from common.rate_limit import get_rate_limiter
+from common.tracing import span
+
+# Search results go stale quickly, so keep them for a few hours by default
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 6 * 60 * 60))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# Tool settings that change what Serper returns for the same query
+SEARCH_PARAMS = ("search_type", "n_results", "country", "location", "locale")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Return the process-wide search cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                cache_path("search.sqlite3"),
+                max_bytes=SEARCH_CACHE_MAX_BYTES,
+                default_ttl=SEARCH_CACHE_TTL,
+            )
+        return _cache
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that answers repeated queries from the run's memo, then the shared disk cache"""
+
+    def _run(self, **kwargs):
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        params = {name: getattr(self, name, None) for name in SEARCH_PARAMS}
+        extra = {k: v for k, v in kwargs.items() if k not in ("search_query", "query")}
+        key = make_key("serper", normalize_query(query), params, extra)
+
+        message = refusal()
+        if message:
+            return message
+        return review(memoized("serper_search", [key], lambda: self._search(key, **kwargs)))
+
+    def _search(self, key, **kwargs):
+        with span("tool", "serper_search") as record:
+            cache = get_search_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                record["cache_hit"] = 1
+                return json.loads(cached)
+            get_rate_limiter().acquire("serper")
+            result = super()._run(**kwargs)
+            cache.set(key, json.dumps(result))
+            return result
+
+
+def get_search_tool():
+    """Create the Serper search tool used by the agents"""
+    return CachedSerperDevTool()
+
+
+def search_cache_summary():
+    return get_search_cache().summary("Search cache")
@@ -0,0 +1,166 @@
+"""Structured run traces: one JSONL span per task, LLM call, tool call and agent step.
+
+Spans are written to .cache/traces/<run id>.jsonl and nest through a context variable,
+so an LLM call made while a task runs is recorded as that task's child. Only the newest
+TRACE_KEEP trace files are kept. Set TRACE=0 to turn tracing off.
+"""
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from common.disk_cache import cache_path
+
+TRACE_ENABLED = os.getenv("TRACE", "1").lower() not in ("0", "false", "no")
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", 100))
+
+_current_run = contextvars.ContextVar("trace_run", default=None)
+_current_span = contextvars.ContextVar("trace_span", default=None)
+_span_ids = itertools.count(1)
+_run_ids = itertools.count(1)
+
+# Counters summed per (kind, name) in the summary table
+TOTALS = ("tokens_in", "tokens_out", "cache_hit", "retries")
+
+
+class TraceRun:
+    """One traced run: appends finished spans to its JSONL file and keeps them for the summary"""
+
+    def __init__(self, name):
+        self.name = name
+        # The counter keeps runs started in the same second by one process apart
+        self.id = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_run_ids)}"
+        self.path = os.path.join(cache_path("traces"), f"{self.id}.jsonl")
+        self.spans = []
+        # Extra lines for the summary, e.g. memo statistics
+        self.notes = []
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        prune_traces(os.path.dirname(self.path), TRACE_KEEP - 1)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, record):
+        with self.lock:
+            self.spans.append(record)
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self.lock:
+            self._file.close()
+
+    def summary(self):
+        """Table of calls, latency, tokens, cache hits and retries per agent/model/tool"""
+        groups = {}
+        for record in self.spans:
+            key = (record["kind"], record["name"])
+            group = groups.setdefault(key, {"calls": 0, "seconds": 0.0, "max": 0.0, "errors": 0})
+            group["calls"] += 1
+            group["seconds"] += record["seconds"]
+            group["max"] = max(group["max"], record["seconds"])
+            group["errors"] += "error" in record
+            for total in TOTALS:
+                group[total] = group.get(total, 0) + int(record.get(total) or 0)
+
+        width = max([len(name) for _, name in groups] + [4])
+        lines = [f"Trace {self.id} ({time.perf_counter() - self.started:.1f}s wall clock, {self.path})",
+                 f"  {'kind':<7} {'name':<{width}} {'calls':>5} {'total':>8} {'mean':>7} {'max':>7} "
+                 f"{'tok in':>8} {'tok out':>8} {'hits':>5} {'retry':>5} {'err':>4}"]
+        # Slowest first, so the agent that dominates latency is at the top of each kind
+        for (kind, name), group in sorted(groups.items(), key=lambda item: (item[0][0], -item[1]["seconds"])):
+            lines.append(
+                f"  {kind:<7} {name:<{width}} {group['calls']:>5} {group['seconds']:>7.1f}s "
+                f"{group['seconds'] / group['calls']:>6.2f}s {group['max']:>6.2f}s "
+                f"{group['tokens_in']:>8} {group['tokens_out']:>8} {group['cache_hit']:>5} "
+                f"{group['retries']:>5} {group['errors']:>4}"
+            )
+        lines.extend(f"  {note}" for note in self.notes)
+        return "\n".join(lines)
+
+
+def prune_traces(directory, keep):
+    """Delete all but the ``keep`` most recently written trace files"""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".jsonl")]
+    paths.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+    for path in paths[max(keep, 0):]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def current_run():
+    return _current_run.get()
+
+
+@contextmanager
+def trace_run(name, print_summary=True):
+    """Trace everything inside the block as one run and print its summary at the end.
+
+    Nested calls reuse the outer run, so e.g. run_pipeline inside an agent's own run
+    adds its spans to that run.
+    """
+    run = _current_run.get()
+    if run is not None or not TRACE_ENABLED:
+        yield run
+        return
+
+    run = TraceRun(name)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.close()
+        if print_summary and run.spans:
+            print(run.summary())
+
+
+@contextmanager
+def span(kind, name, **attrs):
+    """Time the block as a span; set keys on the yielded dict to record tokens, cache hits, etc."""
+    record = dict(attrs)
+    run = _current_run.get()
+    if run is None:
+        yield record
+        return
+
+    record["span"] = next(_span_ids)
+    parent = _current_span.get()
+    token = _current_span.set(record)
+    start_wall = time.time()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current_span.reset(token)
+        record.update({
+            "run": run.id, "parent": parent["span"] if parent else None,
+            "kind": kind, "name": name, "start": start_wall,
+            "seconds": time.perf_counter() - start, "thread": threading.current_thread().name,
+        })
+        if parent is not None:
+            # Roll tokens up, so each task span shows what its agent spent in total
+            with run.lock:
+                for total in ("tokens_in", "tokens_out"):
+                    if record.get(total):
+                        parent[total] = parent.get(total, 0) + record[total]
+        run.write(record)
+
+
+def event(kind, name, **attrs):
+    """Record an instantaneous span, e.g. a single agent step"""
+    with span(kind, name, **attrs):
+        pass
+
+
+def record_step(step):
+    """crewai step_callback: records each agent step (a tool use or the final answer)"""
+    tool = getattr(step, "tool", None)
+    event("step", tool or type(step).__name__, tool_input=str(getattr(step, "tool_input", ""))[:200] or None)
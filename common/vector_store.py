@@ -0,0 +1,309 @@
+"""Maintenance for the local Chroma store that WebsiteSearchTool writes under db/.
+
+Run it by hand:
+
+    python -m common.vector_store --db db --max-age-days 30 --max-bytes 500000000 --rebuild
+
+or set VECTOR_DB_MAINTENANCE=auto to run the lightweight pass after every crew.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+DEFAULT_DB_DIR = os.getenv("VECTOR_DB_DIR", "db")
+# URL index kept by common.website; pages evicted here must be forgotten there too
+PAGE_INDEX_FILE = "page_index.sqlite3"
+DELETE_BATCH = 1000
+
+
+def db_size(db_dir):
+    total = 0
+    for dirpath, _, filenames in os.walk(db_dir):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return total
+
+
+def open_client(db_dir):
+    import chromadb
+    return chromadb.PersistentClient(path=db_dir)
+
+
+# Suffixes of the temporary collections a rebuild works with
+BUILDING, RETIRED = "__rebuild", "__retired"
+
+
+def _names(client):
+    # chromadb < 0.6 returns Collection objects, newer versions return names
+    return [c if isinstance(c, str) else c.name for c in client.list_collections()]
+
+
+def _collections(client):
+    return [client.get_collection(name) for name in _names(client) if not name.endswith((BUILDING, RETIRED))]
+
+
+def _recover(client):
+    """Restore a collection whose rebuild was interrupted between its two renames"""
+    names = set(_names(client))
+    for name in names:
+        original = name[:-len(RETIRED)]
+        if name.endswith(RETIRED) and original not in names:
+            client.get_collection(name).modify(name=original)
+
+
+def _added_at(db_dir, collection_id):
+    """embedding id -> time it was written, read from Chroma's metadata segment"""
+    conn = sqlite3.connect(f"file:{os.path.join(db_dir, 'chroma.sqlite3')}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            """SELECT e.embedding_id, e.created_at FROM embeddings e
+               JOIN segments s ON e.segment_id = s.id
+               WHERE s.collection = ? AND s.scope = 'METADATA'""",
+            (str(collection_id),),
+        ).fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def _delete(collection, ids):
+    for start in range(0, len(ids), DELETE_BATCH):
+        collection.delete(ids=ids[start:start + DELETE_BATCH])
+
+
+def forget_pages(db_dir, urls):
+    """Drop evicted pages from the URL index, so they are fetched and embedded again when next used"""
+    path = os.path.join(db_dir, PAGE_INDEX_FILE)
+    urls = [url for url in urls if url]
+    if not urls or not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _used_at(db_dir):
+    """url -> last time an agent asked for the page, from the URL index, in Chroma's timestamp format"""
+    path = os.path.join(db_dir, PAGE_INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT url, used_at FROM pages WHERE used_at IS NOT NULL").fetchall()
+    except sqlite3.OperationalError:
+        # Index written before reads were recorded
+        return {}
+    finally:
+        conn.close()
+    return {url: datetime.utcfromtimestamp(used_at).strftime("%Y-%m-%d %H:%M:%S") for url, used_at in rows}
+
+
+def _pages(collection, added_at, used_at):
+    """Group chunks by source URL as {url: {"chunks": [(id, page version, content hash, added at)], "last_used"}}
+
+    A page's last use is the later of its last write and the last time an agent read it.
+    """
+    data = collection.get(include=["metadatas", "documents"])
+    pages = {}
+    for chunk_id, metadata, document in zip(data["ids"], data["metadatas"], data["documents"]):
+        metadata = metadata or {}
+        url = metadata.get("url") or metadata.get("source") or ""
+        page = pages.setdefault(url, {"chunks": [], "last_used": used_at.get(url, "")})
+        when = added_at.get(chunk_id, "")
+        page["chunks"].append((chunk_id, metadata.get("hash"), hashlib.sha256((document or "").encode("utf-8")).hexdigest(), when))
+        page["last_used"] = max(page["last_used"], when)
+    return pages
+
+
+def dedupe(collection, pages, forgotten):
+    """Drop chunks from older versions of a page and repeated copies of the same chunk"""
+    stale = []
+    for url, page in pages.items():
+        # The page version written most recently wins
+        latest = max(page["chunks"], key=lambda chunk: chunk[3])[1]
+        seen = set()
+        kept = 0
+        for chunk_id, version, content_hash, _ in page["chunks"]:
+            if (url and version and version != latest) or content_hash in seen:
+                stale.append(chunk_id)
+            else:
+                seen.add(content_hash)
+                kept += 1
+        if not kept:
+            forgotten.add(url)
+    _delete(collection, stale)
+    return len(stale)
+
+
+def evict_old_pages(collection, pages, max_age_days, forgotten):
+    cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    old = [url for url, page in pages.items() if page["last_used"] < cutoff]
+    ids = [chunk[0] for url in old for chunk in pages.pop(url)["chunks"]]
+    _delete(collection, ids)
+    forgotten.update(old)
+    return len(ids)
+
+
+def evict_to_size(db_dir, client, max_bytes, forgotten):
+    """Drop least recently used pages across all collections until the store fits max_bytes"""
+    size = db_size(db_dir)
+    if size <= max_bytes:
+        return 0
+    candidates = []
+    total_chunks = 0
+    used_at = _used_at(db_dir)
+    for collection in _collections(client):
+        pages = _pages(collection, _added_at(db_dir, collection.id), used_at)
+        for url, page in pages.items():
+            candidates.append((page["last_used"], url, collection, [chunk[0] for chunk in page["chunks"]]))
+            total_chunks += len(page["chunks"])
+    if not total_chunks:
+        return 0
+
+    # Assume every chunk costs the same share of the store
+    bytes_per_chunk = size / total_chunks
+    removed = 0
+    for _, url, collection, ids in sorted(candidates, key=lambda candidate: candidate[0]):
+        if size <= max_bytes:
+            break
+        _delete(collection, ids)
+        forgotten.add(url)
+        removed += len(ids)
+        size -= len(ids) * bytes_per_chunk
+    return removed
+
+
+def _drop(client, name):
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+
+
+def rebuild(client, collection):
+    """Recreate a collection from its own data so the HNSW index drops deleted vectors.
+
+    The copy is built under a temporary name and only swapped in once it is complete, so
+    a failure part-way leaves the original collection untouched.
+    """
+    data = collection.get(include=["metadatas", "documents", "embeddings"])
+    name, metadata = collection.name, collection.metadata
+    building, retired = name + BUILDING, name + RETIRED
+    # Leftovers of an interrupted rebuild
+    _drop(client, building)
+    _drop(client, retired)
+    fresh = client.create_collection(building, metadata=metadata, embedding_function=None)
+    try:
+        for start in range(0, len(data["ids"]), DELETE_BATCH):
+            end = start + DELETE_BATCH
+            fresh.add(
+                ids=data["ids"][start:end],
+                embeddings=data["embeddings"][start:end],
+                metadatas=data["metadatas"][start:end],
+                documents=data["documents"][start:end],
+            )
+    except BaseException:
+        _drop(client, building)
+        raise
+    collection.modify(name=retired)
+    fresh.modify(name=name)
+    client.delete_collection(retired)
+    return fresh
+
+
+def vacuum(db_dir):
+    conn = sqlite3.connect(os.path.join(db_dir, "chroma.sqlite3"))
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def maintain(db_dir=DEFAULT_DB_DIR, max_age_days=None, max_bytes=None, rebuild_index=False, vacuum_db=True,
+             drop_collections=False):
+    """Dedupe, evict and compact the store; returns a dict describing what was done.
+
+    Only chunks are deleted unless ``drop_collections`` is set, which also drops collections
+    left empty and cleans up after interrupted rebuilds. That must not run in a process that
+    holds an open collection (e.g. the shared website tool), so only the CLI sets it.
+    """
+    if not os.path.exists(os.path.join(db_dir, "chroma.sqlite3")):
+        return {"skipped": f"no Chroma store in {db_dir}"}
+
+    report = {"size_before": db_size(db_dir), "duplicates": 0, "expired": 0, "over_size": 0}
+    client = open_client(db_dir)
+    forgotten = set()
+    if drop_collections:
+        _recover(client)
+    used_at = _used_at(db_dir)
+    for collection in _collections(client):
+        pages = _pages(collection, _added_at(db_dir, collection.id), used_at)
+        if max_age_days is not None:
+            report["expired"] += evict_old_pages(collection, pages, max_age_days, forgotten)
+        report["duplicates"] += dedupe(collection, pages, forgotten)
+        if rebuild_index:
+            rebuild(client, collection)
+        # Collections left empty are dropped entirely
+        if drop_collections and client.get_collection(collection.name).count() == 0:
+            client.delete_collection(collection.name)
+            forgotten.update(pages)
+
+    if max_bytes is not None:
+        report["over_size"] = evict_to_size(db_dir, client, max_bytes, forgotten)
+    forget_pages(db_dir, forgotten)
+    if vacuum_db:
+        vacuum(db_dir)
+    report["size_after"] = db_size(db_dir)
+    return report
+
+
+def format_report(report):
+    if "skipped" in report:
+        return f"Vector store maintenance skipped: {report['skipped']}"
+    return (f"Vector store: removed {report['duplicates']} duplicate, {report['expired']} expired and "
+            f"{report['over_size']} over-size chunks; "
+            f"{report['size_before'] / 1e6:.1f} MB -> {report['size_after'] / 1e6:.1f} MB")
+
+
+def maintain_after_run(db_dir=DEFAULT_DB_DIR):
+    """Run the lightweight pass when VECTOR_DB_MAINTENANCE=auto; never fails the caller.
+
+    It only removes chunks: collections stay in place, since this process's website tool
+    may still hold them.
+    """
+    if os.getenv("VECTOR_DB_MAINTENANCE", "").lower() != "auto":
+        return None
+    max_age = os.getenv("VECTOR_DB_MAX_AGE_DAYS")
+    max_bytes = os.getenv("VECTOR_DB_MAX_BYTES")
+    try:
+        report = maintain(
+            db_dir,
+            max_age_days=float(max_age) if max_age else None,
+            max_bytes=int(max_bytes) if max_bytes else None,
+        )
+        return format_report(report)
+    except Exception as e:
+        return f"Vector store maintenance failed: {str(e)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate, evict and compact the local Chroma store")
+    parser.add_argument("--db", default=DEFAULT_DB_DIR, help="Chroma persist directory (default: db)")
+    parser.add_argument("--max-age-days", type=float, help="drop pages neither read nor re-indexed for this many days")
+    parser.add_argument("--max-bytes", type=int, help="drop least recently used pages beyond this size")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild HNSW indexes to reclaim deleted vectors")
+    parser.add_argument("--no-vacuum", action="store_true", help="skip VACUUM of chroma.sqlite3")
+    args = parser.parse_args()
+
+    report = maintain(args.db, args.max_age_days, args.max_bytes, args.rebuild, not args.no_vacuum,
+                      drop_collections=True)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
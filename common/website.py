@@ -0,0 +1,175 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import requests
+from crewai_tools import WebsiteSearchTool
+from common.budget import refusal, review
+from common.memo import memoized
+from common.tracing import span
+from common.vector_store import DEFAULT_DB_DIR, PAGE_INDEX_FILE
+
+# Pages checked this recently are trusted without even a conditional request
+PAGE_RECHECK_SECONDS = int(os.getenv("PAGE_RECHECK_SECONDS", 24 * 60 * 60))
+FETCH_TIMEOUT = (5, 30)
+
+
+class PageIndex:
+    """URL -> ETag / Last-Modified / content hash of every page already embedded.
+
+    Lives inside the Chroma directory, so wiping the store also forgets what was indexed.
+    Every lookup also records when the page was last used, for the maintenance pass's
+    least-recently-used eviction.
+    """
+
+    def __init__(self, path):
+        self.reused = 0
+        self.embedded = 0
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at REAL NOT NULL,
+                used_at REAL
+            )"""
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pages)")]
+        if "used_at" not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN used_at REAL")
+        self._conn.commit()
+
+    def _row(self, url):
+        with self._lock:
+            self._conn.execute("UPDATE pages SET used_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT etag, last_modified, content_hash, checked_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _save(self, url, etag, last_modified, content_hash):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, checked_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, now, now),
+            )
+            self._conn.commit()
+
+    def check(self, url, collection=None):
+        """Return (is_fresh, validators, body).
+
+        validators should be passed to mark_embedded() once the page is embedded; body is
+        the fetched page when it had to be downloaded, so callers need not fetch it again.
+        With a collection, a page is only fresh if its chunks are still stored there.
+        Raises requests' RequestException when the page cannot be fetched.
+        """
+        row = self._row(url)
+        if row and collection is not None and not collection.get(where={"url": url}, limit=1)["ids"]:
+            # Evicted by maintenance (or the store was replaced): embed it from scratch
+            row = None
+        if row and time.time() - row[3] < PAGE_RECHECK_SECONDS:
+            return True, None, None
+
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        response = self._session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        if response.status_code == 304 and row:
+            self._save(url, row[0], row[1], row[2])
+            return True, None, None
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+        validators = (
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            hashlib.sha256(response.content).hexdigest(),
+        )
+        if row and row[2] == validators[2]:
+            self._save(url, *validators)
+            return True, None, None
+        return False, validators, response.content
+
+    def mark_embedded(self, url, validators):
+        self._save(url, *(validators or (None, None, None)))
+
+    def summary(self):
+        return f"Website index: {self.reused} pages reused, {self.embedded} embedded"
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_page_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            os.makedirs(DEFAULT_DB_DIR, exist_ok=True)
+            _index = PageIndex(os.path.join(DEFAULT_DB_DIR, PAGE_INDEX_FILE))
+        return _index
+
+
+class PageFetchError(Exception):
+    """A page the agent asked for could not be fetched and embedded"""
+
+
+class CachedWebsiteSearchTool(WebsiteSearchTool):
+    """WebsiteSearchTool that only embeds a page when it is new or has changed.
+
+    Pages go through the batched ingestion pipeline in common.ingest rather than the
+    tool's own one-document-at-a-time path.
+    """
+
+    def add(self, *args, **kwargs):
+        url = args[0] if args else kwargs.get("website")
+        if not url:
+            return super().add(*args, **kwargs)
+        from common.ingest import ingest_urls
+        stats = ingest_urls([url], tool=self)
+        if stats["skipped"]:
+            # This crewai_tools build stores pages some other way; let it add the page itself
+            return super().add(*args, **kwargs)
+        if stats["errors"]:
+            raise PageFetchError(f"Could not read {url}: {stats['errors'][url]}")
+        return None
+
+    def _run(self, *args, **kwargs):
+        message = refusal()
+        if message:
+            return message
+        try:
+            result = memoized("website_search", [args, kwargs], lambda: self._search(*args, **kwargs))
+        except PageFetchError as e:
+            # Searching without the page would only return unrelated content
+            return f"{e}. The page is not in the search index; use another source."
+        return review(result)
+
+    def _search(self, *args, **kwargs):
+        with span("tool", "website_search"):
+            return super()._run(*args, **kwargs)
+
+
+_tool = None
+_tool_lock = threading.Lock()
+
+
+def get_website_tool():
+    """Return the process-wide website search tool, creating it (and its vector store) on first use"""
+    global _tool
+    with _tool_lock:
+        if _tool is None:
+            _tool = CachedWebsiteSearchTool()
+        return _tool
+
+
+def website_index_summary():
+    return get_page_index().summary()
@@ -1,35 +1,113 @@
+import json
 import os
 import sys
-from docx import Document
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from common.docx_stream import iter_paragraphs
+from common.doc_cache import file_hash, get_document_cache
 
-def convert_docx_to_txt(input_folder):
+# Remembers what each .docx looked like when it was last converted
+MANIFEST_NAME = ".docx_manifest.json"
+
+def find_docx_files(input_folder):
+    # Recurse into subfolders, skipping Word's "~$" lock files
+    for dirpath, _, filenames in os.walk(input_folder):
+        for filename in filenames:
+            if filename.endswith(".docx") and not filename.startswith("~$"):
+                yield os.path.join(dirpath, filename)
+
+def txt_path_for(docx_path):
+    return f"{os.path.splitext(docx_path)[0]}.txt"
+
+def load_manifest(input_folder):
+    try:
+        with open(os.path.join(input_folder, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(input_folder, manifest):
+    path = os.path.join(input_folder, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def is_up_to_date(docx_path, entry):
+    txt_path = txt_path_for(docx_path)
+    if not entry or not os.path.exists(txt_path):
+        return False
+    stat = os.stat(docx_path)
+    if stat.st_size != entry["size"]:
+        return False
+    if stat.st_mtime == entry["mtime"] and os.path.getmtime(txt_path) >= stat.st_mtime:
+        return True
+    # Touched but possibly unchanged (e.g. copied or re-synced): compare contents
+    if file_hash(docx_path) == entry["hash"]:
+        entry["mtime"] = stat.st_mtime
+        return True
+    return False
+
+def convert_file(docx_path):
+    """Convert one .docx to .txt; runs in a worker process"""
+    stat = os.stat(docx_path)
+    cache = get_document_cache()
+    cached = cache.open_text(docx_path)
+
+    with open(txt_path_for(docx_path), "w", encoding="utf-8") as txt_file:
+        if cached:
+            # Already extracted (here or by the Teleprompter): just copy the text over
+            with cached:
+                for line in cached:
+                    txt_file.write(line.decode("utf-8"))
+        else:
+            # Stream paragraphs straight into the txt file (and the cache) instead of collecting them first
+            for index, text in enumerate(cache.iter_and_store(docx_path, iter_paragraphs(docx_path))):
+                if index:
+                    txt_file.write("\n")
+                txt_file.write(text)
+
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "hash": cache.content_hash(docx_path)}
+
+def convert_docx_to_txt(input_folder, workers=None):
     # Ensure the input folder exists
     if not os.path.exists(input_folder):
         print(f"The folder {input_folder} does not exist.")
         return
 
-    # Iterate through all files in the folder
-    for filename in os.listdir(input_folder):
-        if filename.endswith(".docx"):
-            docx_path = os.path.join(input_folder, filename)
-            txt_path = os.path.join(input_folder, f"{os.path.splitext(filename)[0]}.txt")
-
-            try:
-                # Open the docx file
-                doc = Document(docx_path)
+    start = time.perf_counter()
+    manifest = load_manifest(input_folder)
+    pending = []
+    skipped = 0
+    for docx_path in find_docx_files(input_folder):
+        key = os.path.relpath(docx_path, input_folder)
+        if is_up_to_date(docx_path, manifest.get(key)):
+            skipped += 1
+        else:
+            pending.append((key, docx_path))
 
-                # Extract text from the document
-                full_text = []
-                for para in doc.paragraphs:
-                    full_text.append(para.text)
+    converted = 0
+    converted_bytes = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {pool.submit(convert_file, path): (key, path) for key, path in pending}
+            for future in as_completed(futures):
+                key, path = futures[future]
+                try:
+                    manifest[key] = future.result()
+                    converted += 1
+                    converted_bytes += manifest[key]["size"]
+                    print(f"Converted {key} to TXT")
+                except Exception as e:
+                    print(f"Error converting {key}: {str(e)}")
 
-                # Write the extracted text to a new txt file
-                with open(txt_path, "w", encoding="utf-8") as txt_file:
-                    txt_file.write("\n".join(full_text))
+    save_manifest(input_folder, manifest)
 
-                print(f"Converted {filename} to TXT")
-            except Exception as e:
-                print(f"Error converting {filename}: {str(e)}")
+    elapsed = time.perf_counter() - start
+    print(f"\nConverted {converted} file(s), {skipped} already up to date, "
+          f"{len(pending) - converted} failed in {elapsed:.2f}s")
+    if converted and elapsed > 0:
+        print(f"Throughput: {converted / elapsed:.1f} files/s, "
+              f"{converted_bytes / elapsed / (1024 * 1024):.2f} MB/s")
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
@@ -37,4 +115,4 @@ if __name__ == "__main__":
         sys.exit(1)
 
     folder_path = sys.argv[1]
-    convert_docx_to_txt(folder_path)
\ No newline at end of file
+    convert_docx_to_txt(folder_path)
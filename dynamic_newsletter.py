@@ -1,29 +1,36 @@
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool
+from crewai import Agent, Task, Crew, LLM
 import os
+from common.llm import wrap_llm
+from common.search import get_search_tool, search_cache_summary
 
-search_tool = SerperDevTool()
+search_tool = get_search_tool()
 
 os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
 
+# Passed to every agent, so batch runs go through the shared rate limiter
+llm = wrap_llm(LLM(model=os.environ["OPENAI_MODEL_NAME"]))
+
 def create_newsletter_crew(topic):
     researcher = Agent(
         role='Research Analyst',
         goal=f'Find the latest and most relevant news about {topic}',
         backstory=f"You're an AI with a knack for discovering trending topics in {topic}.",
-        tools=[search_tool]
+        tools=[search_tool],
+        llm=llm
     )
 
     writer = Agent(
         role='Content Writer',
         goal=f'Create engaging newsletter content about {topic} based on research',
-        backstory=f"You're an AI with a talent for crafting compelling narratives about {topic}."
+        backstory=f"You're an AI with a talent for crafting compelling narratives about {topic}.",
+        llm=llm
     )
 
     editor = Agent(
         role='Copy Editor',
         goal=f'Ensure the {topic} newsletter is polished and error-free',
-        backstory="You're an AI with an eye for detail and a mastery of language."
+        backstory="You're an AI with an eye for detail and a mastery of language.",
+        llm=llm
     )
 
     research_task = Task(
@@ -57,6 +64,7 @@ def main():
     crew = create_newsletter_crew(topic)
     result = crew.kickoff()
     print(result)
+    print(search_cache_summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
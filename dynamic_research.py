@@ -1,16 +1,16 @@
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import OpenAI
-from crewai_tools import SerperDevTool
+from crewai import Agent, Task, Crew, Process, LLM
 import os
+from common.llm import wrap_llm
+from common.search import get_search_tool, search_cache_summary
 
 # Set up tools
-search_tool = SerperDevTool()
-
-# Set up language model
-llm = OpenAI(model_name="gpt-4o-mini")
+search_tool = get_search_tool()
 
 os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
 
+# Set up language model; passed to every agent so batch runs share the rate limiter
+llm = wrap_llm(LLM(model=os.environ["OPENAI_MODEL_NAME"]))
+
 def create_crew(topic):
     # Create researcher agent
     researcher = Agent(
@@ -20,6 +20,7 @@ def create_crew(topic):
         verbose=True,
         allow_delegation=False,
         tools=[search_tool],
+        llm=llm,
     )
 
     # Create writer agent
@@ -29,6 +30,7 @@ def create_crew(topic):
         backstory=f"You are a skilled writer with a passion for explaining complex {topic} concepts in simple terms. Your articles captivate readers while conveying accurate information about advancements in {topic}.",
         verbose=True,
         allow_delegation=False,
+        llm=llm,
     )
 
     research_task = Task(
@@ -58,6 +60,7 @@ def main():
     crew = create_crew(topic)
     result = crew.kickoff()
     print(result)
+    print(search_cache_summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
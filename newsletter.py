@@ -1,8 +1,9 @@
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool
+from crewai import Agent, Task
 import os
+from common.search import get_search_tool, search_cache_summary
+from common.pipeline import run_pipeline
 
-search_tool = SerperDevTool()
+search_tool = get_search_tool()
 
 os.environ["OPENAI_MODEL_NAME"]="o1-mini"
 
@@ -45,24 +46,22 @@ writing_task = Task(
     expected_output=f"Three 300-word articles about the trending topics"
 )
 
-editing_task = Task(
-    description='Proofread and polish the articles, ensuring they flow well together. Integrate the personalized introduction seamlessly.',
-    agent=editor,
-    expected_output="Ensure newsletter is polished."
-)
-
+# Doesn't need the research, so it runs alongside research and writing
 personalization_task = Task(
     description='Analyze reader data and create a personalized introduction for the newsletter',
     agent=personalizer,
+    context=[],
     expected_output = 'Summary of a personalised intro'
 )
 
-newsletter_crew = Crew(
-    agents=[researcher, writer, editor, personalizer],
-    tasks=[research_task, writing_task, editing_task, personalization_task],
-    verbose=True
+editing_task = Task(
+    description='Proofread and polish the articles, ensuring they flow well together. Integrate the personalized introduction seamlessly.',
+    agent=editor,
+    context=[writing_task, personalization_task],
+    expected_output="Ensure newsletter is polished."
 )
 
-result = newsletter_crew.kickoff()
+result = run_pipeline([research_task, writing_task, personalization_task, editing_task])
 print(result)
+print(search_cache_summary())
 
@@ -1,10 +1,10 @@
 from crewai import Agent, Task, Crew, Process
 from langchain_openai import OpenAI
-from crewai_tools import SerperDevTool
 import os
+from common.search import get_search_tool, search_cache_summary
 
 # Set up tools
-search_tool = SerperDevTool()
+search_tool = get_search_tool()
 
 # Set up language model
 llm = OpenAI(model_name="gpt-4o-mini")
@@ -52,4 +52,5 @@ crew = Crew(
 
 result = crew.kickoff()
 print(result)
+print(search_cache_summary())
 
@@ -1,6 +1,78 @@
+import os
+import queue
+import threading
+import time
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import filedialog, messagebox, ttk
-import docx
+from common.docx_stream import iter_paragraphs
+from common.doc_cache import get_document_cache
+
+# Only a window of the script lives in the Text widget; more lines are paged in (and
+# old ones dropped) in steps of PAGE_LINES as the view nears either edge of the window
+WINDOW_LINES = 200
+PAGE_LINES = 50
+EDGE_FRACTION = 0.15
+
+# Scrolling is driven by elapsed time, not by tick count: one unit on the speed scale
+# moves the text by a quarter of a line per second at any font size
+FRAME_MS = 16
+LINES_PER_SECOND_PER_SPEED = 0.25
+# Longer gaps (window drags, system sleep) are not caught up in one jump
+MAX_FRAME_GAP = 0.25
+
+# The loader thread hands lines to the UI in batches; the UI drains them between frames
+LOAD_BATCH_LINES = 500
+LOAD_POLL_MS = 50
+MAX_BATCHES_PER_POLL = 20
+
+def iter_script(file_path, raw):
+    """Yield the script's paragraphs one at a time from an open binary file"""
+    if file_path.endswith('.docx'):
+        yield from iter_paragraphs(raw)
+    else:  # Assume it's a .txt file
+        for line in raw:
+            yield line.decode('utf-8').rstrip('\r\n')
+
+class ScriptLoader(threading.Thread):
+    """Reads a script on a worker thread and queues its lines with the fraction read so far"""
+    
+    def __init__(self, file_path):
+        super().__init__(daemon=True)
+        self.file_path = file_path
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        
+    def cancel(self):
+        self.cancelled.set()
+        
+    def run(self):
+        try:
+            # A .docx seen before is read straight from the extracted-text cache
+            is_docx = self.file_path.endswith('.docx')
+            cache = get_document_cache() if is_docx else None
+            raw = cache.open_text(self.file_path) if cache else None
+            if raw:
+                paragraphs = (line.decode('utf-8').rstrip('\n') for line in raw)
+            else:
+                raw = open(self.file_path, 'rb')
+                paragraphs = iter_script(self.file_path, raw)
+                if is_docx:
+                    paragraphs = cache.iter_and_store(self.file_path, paragraphs)
+            size = os.fstat(raw.fileno()).st_size or 1
+            with raw:
+                batch = []
+                for paragraph in paragraphs:
+                    if self.cancelled.is_set():
+                        return
+                    batch.extend(paragraph.split("\n"))
+                    if len(batch) >= LOAD_BATCH_LINES:
+                        self.queue.put(("lines", batch, raw.tell() / size))
+                        batch = []
+                self.queue.put(("lines", batch, 1.0))
+            self.queue.put(("done", None, 1.0))
+        except Exception as e:
+            self.queue.put(("error", str(e), None))
 
 class Teleprompter:
     def __init__(self, master):
@@ -45,63 +117,186 @@ class Teleprompter:
         self.font_size_scale.set(24)
         self.font_size_scale.grid(row=2, column=1, columnspan=3, padx=5, pady=5, sticky="ew")
         
+        self.status_label = ttk.Label(self.control_frame, text="")
+        self.status_label.grid(row=3, column=0, columnspan=2, padx=5, sticky="w")
+        
+        self.progress = ttk.Progressbar(self.control_frame, orient=tk.HORIZONTAL, maximum=100)
+        self.progress.grid(row=3, column=2, padx=5, sticky="ew")
+        
+        self.cancel_button = ttk.Button(self.control_frame, text="Cancel Load", command=self.cancel_loading)
+        self.cancel_button.grid(row=3, column=3, padx=5, sticky="ew")
+        
         self.control_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
         
         # Text frame below the control frame
         self.text_frame = ttk.Frame(self.main_frame)
         self.text_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.text = tk.Text(self.text_frame, wrap=tk.WORD, font=("Arial", 24), bg="black", fg="white")
+        self.font = tkfont.Font(family="Arial", size=24)
+        self.line_height = self.font.metrics("linespace")
+        self.text = tk.Text(self.text_frame, wrap=tk.WORD, font=self.font, bg="black", fg="white")
         self.text.pack(fill=tk.BOTH, expand=True)
         
         self.scrollbar = ttk.Scrollbar(self.text_frame, orient="vertical", command=self.text.yview)
         self.scrollbar.pack(side="right", fill="y")
-        self.text.configure(yscrollcommand=self.scrollbar.set)
+        self.text.configure(yscrollcommand=self.on_text_scroll)
         
         self.scrolling = False
-        self.scroll_position = 0.0
+        self.last_frame = 0.0
+        self.pixel_remainder = 0.0
+        self.frames = 0
+        self.dropped_frames = 0
+        
+        self.lines = []
+        self.window_start = 0
+        self.window_end = 0
+        self.window_update_pending = False
+        self.loader = None
         
     def load_script(self):
         file_path = filedialog.askopenfilename(filetypes=[("Word Document", "*.docx"), ("Text File", "*.txt")])
         if file_path:
+            self.cancel_loading()
+            self.stop_scrolling()
+            # One entry per widget line, so window offsets map directly to line numbers
+            self.lines = []
+            self.show_window(0)
+            self.progress.configure(value=0)
+            self.status_label.configure(text="Loading...")
+            self.loader = ScriptLoader(file_path)
+            self.loader.start()
+            self.poll_loader(self.loader)
+        
+    def cancel_loading(self):
+        if self.loader:
+            self.loader.cancel()
+            self.loader = None
+            self.status_label.configure(text=f"Loading cancelled after {len(self.lines)} lines")
+        
+    def poll_loader(self, loader):
+        # A newer load (or a cancel) replaced this loader; drop whatever it still sends
+        if loader is not self.loader:
+            return
+        for _ in range(MAX_BATCHES_PER_POLL):
             try:
-                if file_path.endswith('.docx'):
-                    doc = docx.Document(file_path)
-                    full_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-                else:  # Assume it's a .txt file
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        full_text = file.read()
-                self.text.delete(1.0, tk.END)
-                self.text.insert(tk.END, full_text)
-                self.scroll_position = 0.0
-                self.text.yview_moveto(0)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load the document: {str(e)}")
+                kind, payload, fraction = loader.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error":
+                self.loader = None
+                self.status_label.configure(text="")
+                messagebox.showerror("Error", f"Failed to load the document: {payload}")
+                return
+            self.progress.configure(value=fraction * 100)
+            if kind == "done":
+                self.loader = None
+                self.status_label.configure(text=f"Loaded {len(self.lines)} lines")
+                return
+            self.add_lines(payload)
+        self.master.after(LOAD_POLL_MS, self.poll_loader, loader)
+        
+    def add_lines(self, lines):
+        self.lines.extend(lines)
+        # Fill the window as lines arrive, so scrolling can start with the first screenful
+        end = min(len(self.lines), self.window_start + WINDOW_LINES)
+        if end > self.window_end:
+            separator = "\n" if self.window_end > self.window_start else ""
+            self.text.insert(tk.END, separator + "\n".join(self.lines[self.window_end:end]))
+            self.window_end = end
+        
+    def show_window(self, start):
+        self.window_start = start
+        self.window_end = min(len(self.lines), start + WINDOW_LINES)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(self.lines[self.window_start:self.window_end]))
+        self.text.yview_moveto(0)
+        
+    def on_text_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self.window_update_pending:
+            self.window_update_pending = True
+            self.master.after_idle(self.update_window)
+        
+    def update_window(self):
+        self.window_update_pending = False
+        first, last = self.text.yview()
+        if last > 1.0 - EDGE_FRACTION and self.window_end < len(self.lines):
+            self.page_down()
+        elif first < EDGE_FRACTION and self.window_start > 0:
+            self.page_up()
+        
+    def page_down(self):
+        end = min(len(self.lines), self.window_end + PAGE_LINES)
+        self.text.insert(tk.END, "\n" + "\n".join(self.lines[self.window_end:end]))
+        self.window_end = end
+        excess = (self.window_end - self.window_start) - WINDOW_LINES
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.window_start += excess
+        
+    def page_up(self):
+        start = max(0, self.window_start - PAGE_LINES)
+        self.text.insert("1.0", "\n".join(self.lines[start:self.window_start]) + "\n")
+        self.window_start = start
+        excess = (self.window_end - self.window_start) - WINDOW_LINES
+        if excess > 0:
+            self.text.delete(f"{WINDOW_LINES + 1}.0-1c", tk.END)
+            self.window_end -= excess
         
     def start_scrolling(self):
+        if self.scrolling:
+            return
         self.scrolling = True
+        self.last_frame = time.monotonic()
+        self.pixel_remainder = 0.0
+        self.frames = 0
+        self.dropped_frames = 0
         self.scroll_text()
         
     def stop_scrolling(self):
         self.scrolling = False
+        self.show_frame_stats()
         
     def restart_scrolling(self):
-        self.scroll_position = 0.0
-        self.text.yview_moveto(0)
+        self.stop_scrolling()
+        self.show_window(0)
         self.start_scrolling()
         
     def scroll_text(self):
-        if self.scrolling:
-            self.scroll_position += 0.0001 * self.speed_scale.get()
-            self.text.yview_moveto(self.scroll_position)
-            if self.scroll_position >= 1.0:
-                self.stop_scrolling()
-                return
-            self.master.after(20, self.scroll_text)
+        if not self.scrolling:
+            return
+        now = time.monotonic()
+        elapsed = now - self.last_frame
+        self.last_frame = now
+        
+        # Anything well past the frame interval means the timer fired late and frames were lost
+        missed = round(elapsed * 1000 / FRAME_MS) - 1
+        if missed > 0:
+            self.dropped_frames += missed
+        self.frames += 1
+        if self.frames % 60 == 0:
+            self.show_frame_stats()
+        
+        pixels_per_second = self.speed_scale.get() * LINES_PER_SECOND_PER_SPEED * self.line_height
+        self.pixel_remainder += min(elapsed, MAX_FRAME_GAP) * pixels_per_second
+        step = int(self.pixel_remainder)
+        if step:
+            self.pixel_remainder -= step
+            self.text.yview_scroll(step, "pixels")
+        
+        if self.text.yview()[1] >= 1.0 and self.window_end >= len(self.lines) and self.loader is None:
+            self.stop_scrolling()
+            return
+        self.master.after(FRAME_MS, self.scroll_text)
+        
+    def show_frame_stats(self):
+        if self.frames:
+            self.status_label.configure(text=f"Dropped frames: {self.dropped_frames} of {self.frames + self.dropped_frames}")
         
     def change_font_size(self, size):
         new_size = int(float(size))
-        self.text.configure(font=("Arial", new_size))
+        self.font.configure(size=new_size)
+        self.line_height = self.font.metrics("linespace")
         # Adjust text widget height to maintain visibility of control frame
         approx_lines = 500 // new_size  # Reduced from 600 to account for control frame
         self.text.configure(height=approx_lines)
@@ -0,0 +1,25 @@
+import zipfile
+from common.docx_stream import iter_paragraphs
+
+NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+# Tab stops defined in the paragraph properties must not appear in the text
+TAB_STOPS_DOCUMENT = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document {NS}><w:body>
+<w:p>
+  <w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/><w:tab w:val="right" w:pos="9360"/></w:tabs></w:pPr>
+  <w:r><w:t>Hello</w:t><w:tab/><w:t>World</w:t></w:r>
+</w:p>
+<w:p><w:r><w:t>Line</w:t><w:br/><w:t>break</w:t></w:r></w:p>
+</w:body></w:document>"""
+
+
+def write_docx(path, document):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", document)
+    return path
+
+
+def test_tab_stops_in_paragraph_properties_are_ignored(tmp_path):
+    path = write_docx(tmp_path / "tabs.docx", TAB_STOPS_DOCUMENT)
+    assert list(iter_paragraphs(path)) == ["Hello\tWorld", "Line\nbreak"]
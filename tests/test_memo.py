@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from common.memo import RunMemo
+
+
+def call_in_thread(memo, key, fn):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = memo.call("search", key, fn)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_calls_run_once():
+    memo, release, calls = RunMemo(), threading.Event(), []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    owner, first = call_in_thread(memo, "key", slow)
+    wait_for(lambda: calls)
+    waiter, second = call_in_thread(memo, "key", slow)
+    wait_for(lambda: memo.coalesced == 1)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert first["result"] == second["result"] == "result"
+    assert memo.call("search", "key", slow) == "result"
+    assert len(calls) == 1
+    assert (memo.misses, memo.coalesced, memo.hits) == (1, 1, 1)
+
+
+def test_failure_reaches_waiters_and_is_not_remembered():
+    memo, release, calls = RunMemo(), threading.Event(), []
+
+    def failing():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    owner, first = call_in_thread(memo, "key", failing)
+    wait_for(lambda: calls)
+    waiter, second = call_in_thread(memo, "key", failing)
+    wait_for(lambda: memo.coalesced == 1)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert isinstance(first["error"], RuntimeError)
+    assert second["error"] is first["error"]
+    # The next identical call gets to try again
+    assert memo.call("search", "key", lambda: "retried") == "retried"
+    assert len(calls) == 1
+    assert memo.misses == 2
+
+
+def test_different_keys_are_not_shared():
+    memo = RunMemo()
+    assert memo.call("search", "a", lambda: 1) == 1
+    assert memo.call("search", "b", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        memo.call("search", "c", lambda: int("x"))
+    assert memo.misses == 3
@@ -0,0 +1,87 @@
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("crewai")
+
+from common import disk_cache, pipeline
+from common.pipeline import CheckpointStore, run_pipeline
+
+
+def make_task(role, context=None):
+    return SimpleNamespace(description=f"{role} task", expected_output="", agent=SimpleNamespace(role=role),
+                           context=context, output=None)
+
+
+class StubCrew:
+    """Stands in for crewai.Crew: runs ``behaviour[role](task)`` and stores its return value as the output"""
+
+    behaviour = {}
+    calls = []
+
+    def __init__(self, agents, tasks, **kwargs):
+        self.task = tasks[0]
+
+    def kickoff(self):
+        role = self.task.agent.role
+        StubCrew.calls.append(role)
+        self.task.output = SimpleNamespace(raw=StubCrew.behaviour[role](self.task))
+
+
+@pytest.fixture(autouse=True)
+def stub_crew(monkeypatch, tmp_path):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "Crew", StubCrew)
+    StubCrew.behaviour, StubCrew.calls = {}, []
+
+
+def upstream(task):
+    return "+".join(dep.output.raw for dep in task.context)
+
+
+def run(tasks, **kwargs):
+    return run_pipeline(tasks, verbose=False, backoff=0, context_budget=0, **kwargs)
+
+
+def test_independent_tasks_run_in_parallel_and_dependents_wait():
+    # Both first tasks must be running at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def independent(task):
+        barrier.wait()
+        return task.agent.role
+
+    a, b = make_task("a", []), make_task("b", [])
+    c = make_task("c", [a, b])
+    StubCrew.behaviour = {"a": independent, "b": independent, "c": upstream}
+
+    assert run([a, b, c]).raw == "a+b"
+    assert StubCrew.calls[-1] == "c"
+
+
+def test_tasks_without_context_run_in_order():
+    tasks = [make_task("a"), make_task("b"), make_task("c")]
+    StubCrew.behaviour = {"a": lambda task: "a", "b": upstream, "c": upstream}
+
+    assert run(tasks).raw == "a+a"
+    assert StubCrew.calls == ["a", "b", "c"]
+
+
+def test_resumes_from_checkpoint_after_a_failing_task():
+    def fail(task):
+        raise RuntimeError("boom")
+
+    tasks = [make_task("a"), make_task("b"), make_task("c")]
+    StubCrew.behaviour = {"a": lambda task: "a", "b": fail, "c": upstream}
+    with pytest.raises(RuntimeError):
+        run(tasks, store=CheckpointStore("test"), max_retries=2)
+    assert StubCrew.calls == ["a", "b", "b"]
+
+    StubCrew.calls = []
+    StubCrew.behaviour["b"] = lambda task: "b"
+    tasks = [make_task("a"), make_task("b"), make_task("c")]
+    store = CheckpointStore("test")
+    assert run(tasks, store=store).raw == "a+b"
+    # The saved output of "a" is reused instead of running it again
+    assert StubCrew.calls == ["b", "c"]
+    assert store.load(0, tasks[0]) is None
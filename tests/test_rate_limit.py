@@ -0,0 +1,59 @@
+import pytest
+from common import rate_limit
+from common.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Replaces the time module in common.rate_limit: sleeping advances the clock instead of blocking"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_waits_for_the_bucket_to_refill_instead_of_failing(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / "limits.sqlite3"), {"openai": {"rpm": 2}})
+    limiter.acquire("openai")
+    limiter.acquire("openai")
+    assert clock.sleeps == []
+
+    # The bucket is empty: one request refills in 30s, waited out in steps of at most 5s
+    limiter.acquire("openai")
+    assert sum(clock.sleeps) == pytest.approx(30)
+    assert max(clock.sleeps) <= 5
+
+
+def test_request_larger_than_the_token_budget_waits_for_a_full_bucket(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / "limits.sqlite3"), {"openai": {"tpm": 1000}})
+    limiter.acquire("openai", tokens=600)
+    limiter.acquire("openai", tokens=5000)
+    assert sum(clock.sleeps) == pytest.approx(36)
+
+
+def test_limiters_on_the_same_file_share_buckets(tmp_path, clock):
+    path = str(tmp_path / "limits.sqlite3")
+    limits = {"serper": {"rpm": 1}}
+    RateLimiter(path, limits).acquire("serper")
+    RateLimiter(path, limits).acquire("serper")
+    assert sum(clock.sleeps) == pytest.approx(60)
+
+
+def test_providers_without_limits_never_wait(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / "limits.sqlite3"), {"openai": {"rpm": 1}})
+    for _ in range(3):
+        limiter.acquire("ollama", tokens=10 ** 6)
+    assert clock.sleeps == []